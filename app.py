@@ -1,95 +1,329 @@
+import json
 import re
+import time
+import uuid
+from contextlib import nullcontext
 
 import streamlit as st
 import pandas as pd
-from src.pdf_processor import mock_room_extraction
-from src.calculator import process_takeoff
-from src.excel_exporter import generate_workbook
+from src.excel_exporter import workbook_bytes
 from src.floor_visualizer import generate_floor_plan_svg, SVG_W
+from src.floor_tiles import TilePyramid
+from src.takeoff_cache import cache_key, file_digest
+from src.takeoff_session import TakeoffSession
+from src.profiling import Profiler, stage
+from src.finish_systems import REGISTRY
+from src.rollups import MEASURES
+from src.job_service import JobService, QueueFull
+from src.typical import collapse, typical_rooms_data
 
 st.set_page_config(page_title="RAD PaintPilot MVP", page_icon="🎨")
 st.title("🎨 RAD PaintPilot - Pro Plan Demo")
 
-uploaded_file = st.file_uploader("Upload Floor Plan PDF", type=['pdf'])
+# Everything below the upload is cached per (file hash, config, extractor), so
+# widget-only reruns (toggles, export clicks) never recompute the pipeline.
+# cache_resource shares one read-only copy across sessions instead of
+# re-pickling large results on every rerun.
 
-if uploaded_file:
-    with st.spinner("🤖 AI analyzing drawings..."):
-        import time
-        time.sleep(1.5)
-        # Pass the file object - mock_room_extraction doesn't use it anyway
-        rooms_data = mock_room_extraction(uploaded_file)
-        results = process_takeoff(rooms_data)
-
-    st.success("✅ Analysis complete!")
-    
-    # Debug: show rooms_data structure
-    with st.expander("Debug: Room Data"):
-        st.json(rooms_data)
-
-    # --- Floor Plan Visualization ---
-    st.subheader("📐 Floor Plan Preview")
-    svg_markup = generate_floor_plan_svg(rooms_data)
-    fit_to_screen = st.toggle("Fit floor plan to screen", value=True)
-
-    if fit_to_screen:
-        responsive_svg = re.sub(r'width="[^"]+"', 'width="100%"', svg_markup, count=1)
-        responsive_svg = re.sub(r'height="[^"]+"', '', responsive_svg, count=1)
-        if 'preserveAspectRatio' not in responsive_svg:
-            responsive_svg = re.sub(r'<svg', '<svg preserveAspectRatio="xMidYMid meet"', responsive_svg, count=1)
-        responsive_svg = re.sub(
-            r'<svg([^>]*)>',
-            r'<svg\1 style="width:100%; height:auto; display:block; max-height:80vh;">',
-            responsive_svg,
-            count=1,
-        )
-        container_html = f"""
+def _upload_key(uploaded_file, real_extract: bool) -> str:
+    """Cache key for an upload; the sha256 is memoized per upload in session state."""
+    digests = st.session_state.setdefault("upload_digests", {})
+    file_id = getattr(uploaded_file, "file_id", None)
+    digest = digests.get(file_id) if file_id else None
+    if digest is None:
+        with stage("hash_upload"):
+            digest = file_digest(uploaded_file)
+        if file_id:
+            digests[file_id] = digest
+    return cache_key(None, "pdfplumber" if real_extract else "mock", digest=digest)
+
+# Takeoffs run in the local job service's worker processes; the script only
+# submits the upload and polls, so a heavy plan set never blocks the session.
+POLL_SECONDS = 0.5
+
+@st.cache_resource(show_spinner=False)
+def job_service() -> JobService:
+    """One worker pool and queue per Streamlit server, shared by every session."""
+    return JobService()
+
+def _submit_takeoff(key: str, real_extract: bool, uploaded_file, retry: bool = False):
+    """Job id for this upload (identical uploads share a job); None while the queue is full.
+
+    A failed job stays failed (and shown) until `retry` submits it again.
+    """
+    with stage("submit_job"):
+        try:
+            return job_service().submit(uploaded_file, real_extract, name=uploaded_file.name, key=key,
+                                        retry=retry)
+        except QueueFull:
+            return None
+
+def _job_artifact(job_id: str, name: str):
+    try:
+        return job_service().artifact(job_id, name)
+    except KeyError:  # evicted since; recompute locally
+        return None
+
+def _responsive_svg(svg_markup: str) -> str:
+    responsive_svg = re.sub(r'width="[^"]+"', 'width="100%"', svg_markup, count=1)
+    responsive_svg = re.sub(r'height="[^"]+"', '', responsive_svg, count=1)
+    if 'preserveAspectRatio' not in responsive_svg:
+        responsive_svg = re.sub(r'<svg', '<svg preserveAspectRatio="xMidYMid meet"', responsive_svg, count=1)
+    return re.sub(
+        r'<svg([^>]*)>',
+        r'<svg\1 style="width:100%; height:auto; display:block; max-height:80vh;">',
+        responsive_svg,
+        count=1,
+    )
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def floor_plan_html(key: str, _rooms_data, _svg_path=None) -> dict:
+    """Both container variants of the floor plan, keyed by fit-to-screen.
+
+    `_svg_path` is the job's pre-rendered plan (unedited takeoffs).
+    """
+    if _svg_path:
+        svg_markup = _svg_path.read_text(encoding="utf-8")
+    else:
+        with stage("generate_floor_plan_svg") as s:
+            svg_markup = generate_floor_plan_svg(_rooms_data)
+            s.count("rooms", len(_rooms_data.get("rooms", [])))
+            s.count("bytes_written", len(svg_markup))
+    fit_html = f"""
         <div style="width: min(96vw, 1700px); margin: 0 auto; border-radius: 12px; padding: 20px; background: #ffffff; border: 1px solid #d5d5d5; box-shadow: 0 6px 18px rgba(15, 23, 42, 0.08);">
           <div style="display:flex; justify-content:center;">
-            {responsive_svg}
+            {_responsive_svg(svg_markup)}
           </div>
         </div>
         """
-    else:
-        container_html = f"""
+    scroll_html = f"""
         <div style="max-width: 100%; overflow-x: auto; border-radius: 12px; padding: 16px; background: #ffffff; border: 1px solid #e0e0e0; box-shadow: 0 4px 12px rgba(15, 23, 42, 0.05);">
           <div style="min-width: {SVG_W}px; margin: 0 auto; display:flex; justify-content:center;">
             {svg_markup}
           </div>
         </div>
         """
+    return {True: fit_html, False: scroll_html}
+
+# Above this many rooms the preview defaults to raster tiles instead of SVG.
+RASTER_PREVIEW_THRESHOLD = 1000
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def typical_preview(key: str, _rooms_data) -> dict:
+    """rooms_data with each group of identical floors reduced to its first floor."""
+    with stage("typical_floors", rooms=len(_rooms_data.get("rooms", []))):
+        return typical_rooms_data(_rooms_data)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def tile_pyramid(key: str, _rooms_data) -> TilePyramid:
+    """Raster preview for one takeoff; its PNGs are also cached on disk per project hash."""
+    return TilePyramid(_rooms_data)
+
+# TakeoffResults column -> room table header
+ROOM_TABLE_LABELS = {
+    "id": "Room ID", "name": "Name", "length": "L", "width": "W", "height": "H",
+    "doors": "Doors", "windows": "Windows", "finish_type": "Finish",
+    "gross_area": "Gross Area", "net_area": "Net Area", "primer_gallons": "Primer (gal)",
+    "finish_gallons": "Finish (gal)", "total_gallons": "Total (gal)", "rolls": "Rolls",
+}
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def room_table(key: str, _results) -> pd.DataFrame:
+    with stage("room_table", rooms=len(_results)):
+        return _results.to_dataframe(labels=ROOM_TABLE_LABELS)
+
+# Rollup column -> rollup table header
+ROLLUP_TABLE_LABELS = {
+    "level": "Level", "project": "Project", "floor": "Floor", "room_type": "Room Type", "system": "System",
+    "rooms": "Rooms", "gross_area": "Gross Area", "net_area": "Net Area", "primer_gallons": "Primer (gal)",
+    "finish_gallons": "Finish (gal)", "total_gallons": "Total (gal)", "rolls": "Rolls",
+}
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def rollup_table(key: str, _session: TakeoffSession) -> pd.DataFrame:
+    """Project -> floor -> room type -> system outline (indented by depth)."""
+    with stage("rollup", rooms=len(_session.results)):
+        df = _session.rollup().to_dataframe()
+    if df.empty:
+        return df
+    labels = df["system"].where(df["level"] == "system", df["room_type"])
+    labels = labels.where(df["level"].isin(["room_type", "system"]), df["floor"])
+    labels = labels.where(df["level"] != "project", df["project"])
+    df.insert(0, "Group", ["\u2003" * d + str(v) for d, v in zip(df["depth"], labels)])
+    columns = ["Group", "level", *MEASURES]
+    return df[columns].rename(columns=ROLLUP_TABLE_LABELS)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def bid_package_bytes(key: str, _session: TakeoffSession, typical: bool = False) -> bytes:
+    """The bid package; `typical` lists repeated floors and identical rooms once (×N)."""
+    with stage("generate_workbook", rooms=len(_session.results)) as s:
+        if typical:
+            export = collapse(_session.results)
+            rollup = export.rollup(_session.project, _session.floor)
+        else:
+            export, rollup = _session.results, _session.rollup()
+        data = workbook_bytes(export, totals=_session.totals(), rollup=rollup)
+        s.count("bytes_written", len(data))
+    return data
 
-    st.markdown(container_html, unsafe_allow_html=True)
-    st.caption("Pastel blue = Paint • Pastel green = Wallcovering • Hover rooms for details")
-
-    # --- Room Breakdown Table ---
-    st.subheader("Room Breakdown")
-    rows = []
-    for r in results:
-        room = r['room']
-        m = r['materials']
-        rows.append({
-            "Room ID": room['id'],
-            "Name": room['name'],
-            "L": room['length'],
-            "W": room['width'],
-            "H": room['height'],
-            "Doors": room['doors'],
-            "Windows": room['windows'],
-            "Finish": m['type'],
-            "Gross Area": r['gross_area'],
-            "Net Area": r['net_area'],
-            "Primer (gal)": m.get('primer_gallons'),
-            "Finish (gal)": m.get('finish_gallons'),
-            "Total (gal)": m.get('total_gallons'),
-            "Rolls": m.get('rolls'),
-        })
-    st.dataframe(pd.DataFrame(rows), use_container_width=True)
-
-    # --- Export ---
-    if st.button("📥 Generate Bid Package (Excel)"):
-        import os
-        os.makedirs("output", exist_ok=True)
-        out_path = "output/bid.xlsx"
-        generate_workbook(results, out_path)
-        with open(out_path, "rb") as f:
-            st.download_button("Download Excel", f, file_name="bid_package.xlsx")
+# Room table columns the estimator may edit -> room dict keys
+EDITABLE_COLUMNS = {
+    "Room ID": "id", "Name": "name", "L": "length", "W": "width", "H": "height",
+    "Doors": "doors", "Windows": "windows", "Finish": "finish_type",
+}
+COMPUTED_COLUMNS = ["Gross Area", "Net Area", "Primer (gal)", "Finish (gal)", "Total (gal)", "Rolls"]
+NEW_ROOM_DEFAULTS = {"id": "new", "name": "New Room", "length": 10, "width": 10, "height": 9,
+                     "doors": 1, "windows": 0, "finish_type": "paint"}
+
+def _takeoff_session(key: str, job_id: str) -> TakeoffSession:
+    """This user's editable session for the current upload (never shared).
+
+    The job's takeoff is read back from the job service only when the
+    session starts, not on every rerun.
+    """
+    current = st.session_state.get("takeoff_session")
+    if not current or current[0] != key:
+        with stage("load_takeoff"):
+            rooms_data, results = job_service().result(job_id)
+        current = (key, TakeoffSession(rooms_data, results))
+        st.session_state["takeoff_session"] = current
+        st.session_state.setdefault("session_token", uuid.uuid4().hex)
+    return current[1]
+
+def _view_key(key: str, session: TakeoffSession) -> str:
+    """Cache key for derived artifacts; edited sessions get a private key."""
+    if session.revision == 0:
+        return key
+    return f"{key}@{st.session_state['session_token']}:{session.revision}"
+
+def _room_changes(values: dict) -> dict:
+    return {EDITABLE_COLUMNS[c]: v for c, v in values.items() if c in EDITABLE_COLUMNS and v is not None}
+
+def _apply_room_edits(editor_key: str, session: TakeoffSession):
+    """Push data_editor deltas into the session, one room at a time."""
+    delta = st.session_state[editor_key]
+    for row, values in delta.get("edited_rows", {}).items():
+        changes = _room_changes(values)
+        if changes:
+            session.update_room(int(row), **changes)
+    for row in sorted(delta.get("deleted_rows", []), reverse=True):
+        session.remove_room(row)
+    for values in delta.get("added_rows", []):
+        session.add_room({**NEW_ROOM_DEFAULTS, **_room_changes(values)})
+
+uploaded_file = st.file_uploader("Upload Floor Plan PDF", type=['pdf'])
+real_extract = st.toggle("Parse room schedule from PDF (beta)", value=False)
+show_timings = st.toggle("Show stage timings", value=False)
+
+# Stage timings for this rerun; stages served from cache don't show up.
+profiler = Profiler() if show_timings else None
+with profiler.activate() if profiler else nullcontext():
+    if uploaded_file:
+        key = _upload_key(uploaded_file, real_extract)
+        job_id = _submit_takeoff(key, real_extract, uploaded_file)
+        status = job_service().status(job_id) if job_id else {"state": "busy"}
+        if status["state"] in ("busy", "queued", "running"):
+            message = {
+                "busy": "⏳ All workers are busy and the queue is full; retrying...",
+                "queued": f"⏳ Waiting for a worker (#{status.get('position', 1)} in line)...",
+                "running": "🤖 AI analyzing drawings...",
+            }[status["state"]]
+            with st.spinner(message):
+                time.sleep(POLL_SECONDS)
+            st.rerun()
+        if status["state"] == "failed":
+            st.error(f"❌ Takeoff failed: {status['error']}")
+            if st.button("Retry takeoff"):
+                _submit_takeoff(key, real_extract, uploaded_file, retry=True)
+                st.rerun()
+            st.stop()
+        st.success("✅ Analysis complete!")
+        session = _takeoff_session(key, job_id)
+        view_key = _view_key(key, session)
+
+        # Debug: show rooms_data structure
+        with st.expander("Debug: Room Data"):
+            st.json({**session.rooms_data, "rooms": [dict(r) for r in session.rooms_data["rooms"]]})
+
+        # Preview and export can show each group of identical floors once.
+        typical = st.toggle("Collapse typical floors (repeated floors once, ×N)", value=False)
+        preview_key = f"{view_key}:typical" if typical else view_key
+        preview_data = typical_preview(view_key, session.rooms_data) if typical else session.rooms_data
+
+        # --- Floor Plan Visualization ---
+        st.subheader("📐 Floor Plan Preview")
+        raster = st.toggle("Raster preview (thumbnail + zoomable tiles)",
+                           value=len(preview_data["rooms"]) > RASTER_PREVIEW_THRESHOLD)
+        if raster:
+            # Fixed-size PNGs: the browser's work no longer grows with the room count.
+            pyramid = tile_pyramid(preview_key, preview_data)
+            with stage("render_thumbnail", rooms=pyramid.n_rooms):
+                st.image(pyramid.thumbnail(), caption="Whole floor")
+            zoom = st.slider("Detail zoom", 0, pyramid.max_zoom, pyramid.max_zoom)
+            _, rows = pyramid.grid(zoom)
+            row = st.slider("Tile row", 0, rows - 1, 0) if rows > 1 else 0
+            with stage("render_tiles", zoom=zoom, row=row):
+                st.image(pyramid.tile_row(zoom, row), caption=f"Zoom {zoom} • row {row + 1} of {rows}")
+        else:
+            fit_to_screen = st.toggle("Fit floor plan to screen", value=True)
+            svg_path = _job_artifact(job_id, "floor_plan.svg") if session.revision == 0 and not typical else None
+            container_html = floor_plan_html(preview_key, preview_data, svg_path)[fit_to_screen]
+            st.markdown(container_html, unsafe_allow_html=True)
+        st.caption("Pastel blue = Paint & coatings • Pastel green = Wallcovering"
+                   + ("" if raster else " • Hover rooms for details"))
+
+        # --- Running totals (updated incrementally on every edit) ---
+        totals = session.totals()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Net Area (sf)", f"{totals['net']:,.2f}")
+        systems = [totals[name] for name in REGISTRY.names]
+        c2.metric("Coatings (gal)", f"{sum(s.get('total', 0.0) for s in systems):,.2f}")
+        c3.metric("Wallcovering (rolls)", f"{sum(s.get('rolls', 0.0) for s in systems):,.1f}")
+
+        # --- Room Breakdown Table ---
+        st.subheader("Room Breakdown")
+        st.caption("Edit dimensions, openings or finish; only the changed rooms are recalculated.")
+        editor_key = f"room_editor:{view_key}"
+        st.data_editor(
+            room_table(view_key, session.results),
+            key=editor_key,
+            on_change=_apply_room_edits,
+            args=(editor_key, session),
+            disabled=COMPUTED_COLUMNS,
+            num_rows="dynamic",
+            column_config={
+                "Finish": st.column_config.SelectboxColumn(options=list(REGISTRY.names), required=True),
+            },
+            use_container_width=True,
+        )
+
+        with st.expander("🧮 Rollup by floor, room type and finish system"):
+            st.dataframe(rollup_table(view_key, session), hide_index=True, use_container_width=True)
+
+        # --- Export ---
+        # Unedited takeoffs download the job's workbook; edited ones are built
+        # in memory on click (no shared output file between sessions) and
+        # reused for repeat downloads.
+        workbook_path = _job_artifact(job_id, "bid_package.xlsx") if session.revision == 0 and not typical else None
+        st.download_button(
+            "📥 Download Bid Package (Excel)",
+            data=workbook_path.read_bytes if workbook_path else (
+                lambda: bid_package_bytes(preview_key, session, typical)),
+            file_name="bid_package.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore",
+        )
+
+if profiler:
+    with st.expander("⏱️ Stage timings", expanded=True):
+        if profiler.stages:
+            st.dataframe(pd.DataFrame(profiler.summary()), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Nothing was recomputed on this run; every stage was served from cache.")
+        st.download_button(
+            "Download trace (Chrome trace JSON)",
+            data=json.dumps(profiler.chrome_trace()),
+            file_name="paintpilot_trace.json",
+            mime="application/json",
+            on_click="ignore",
+        )
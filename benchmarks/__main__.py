@@ -0,0 +1,223 @@
+"""Benchmark suite for the takeoff pipeline.
+
+    python -m benchmarks run --sizes 10 1000 100000 --out benchmarks/results/latest.json
+    python -m benchmarks run --save-baseline            # refresh benchmarks/baseline.json
+    python -m benchmarks compare benchmarks/results/latest.json
+    python -m benchmarks imports                        # CLI import-time budget
+
+Each case is timed (best of --repeat runs) and, separately, memory-profiled
+with tracemalloc, since tracing slows the code down too much to time it.
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.calculator import process_takeoff
+from src.excel_exporter import generate_workbook
+from src.rollups import Rollup
+from src.scenarios import evaluate_scenarios, scenario_grid
+from src.floor_visualizer import generate_floor_plan_svg
+from src.synthetic import project_of_size
+from src.typical import collapse
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# `import main` must stay under this (cumulative -X importtime, best run) and
+# must not pull in the heavy dependencies; the pipeline imports them lazily.
+IMPORT_BUDGET_MS = 60
+LAZY_MODULES = ("numpy", "openpyxl", "pdfplumber", "pandas", "pyarrow", "streamlit")
+
+# 96 alternates: finish coats x primer x coverage x roll size
+SCENARIO_GRID = {"paint.finish.coats": [1, 2, 3], "paint.primer.coats": [0, 1],
+                 "paint.*.coverage": [300, 350, 400, 450], "wallcovering.rolls.coverage": [30, 36, 45, 54]}
+
+
+def _cases(rooms_data):
+    """name -> zero-arg callable; inputs are prepared outside the timed region."""
+    results = process_takeoff(rooms_data)
+    scenarios = scenario_grid(SCENARIO_GRID)
+    return {
+        "process_takeoff": lambda: process_takeoff(rooms_data),
+        "rollup": lambda: Rollup.from_columns(results.rooms, results.columns),
+        "evaluate_scenarios": lambda: evaluate_scenarios(results, scenarios),
+        "typical_floors": lambda: collapse(results),
+        "generate_workbook": lambda: generate_workbook(results, io.BytesIO()),
+        "generate_floor_plan_svg": lambda: generate_floor_plan_svg(rooms_data),
+    }
+
+
+def _time(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def _peak_mib(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, repeat, seed, memory=True, only=None):
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        rooms_data = project_of_size(size, seed)
+        n_rooms = len(rooms_data["rooms"])
+        for name, fn in _cases(rooms_data).items():
+            if only and name not in only:
+                continue
+            # Big cases run fewer times; one 100k-room workbook already takes seconds.
+            runs = _time(fn, repeat if n_rooms <= 10_000 else max(1, repeat // 3))
+            entry = {
+                "rooms": n_rooms,
+                "best_s": round(min(runs), 6),
+                "mean_s": round(sum(runs) / len(runs), 6),
+                "runs": len(runs),
+            }
+            if memory:
+                entry["peak_mib"] = round(_peak_mib(fn), 3)
+            key = f"{name}@{size}"
+            report["results"][key] = entry
+            mem = f"  peak {entry['peak_mib']:.1f} MiB" if memory else ""
+            print(f"{key:<32} {n_rooms:>7} rooms  best {entry['best_s']*1000:10.2f} ms{mem}", flush=True)
+    return report
+
+
+def compare(baseline, current, time_threshold, memory_threshold):
+    """Print a comparison table; return the list of regressed case keys."""
+    regressions = []
+    print(f"{'case':<32} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if not base:
+            print(f"{key:<32} {'-':>12} {cur['best_s']*1000:10.2f}ms {'new':>7}")
+            continue
+        ratio = cur["best_s"] / base["best_s"] if base["best_s"] else float("inf")
+        flags = []
+        if ratio > 1 + time_threshold:
+            flags.append("TIME")
+        if "peak_mib" in cur and "peak_mib" in base and base["peak_mib"] > 0:
+            if cur["peak_mib"] / base["peak_mib"] > 1 + memory_threshold:
+                flags.append("MEMORY")
+        if flags:
+            regressions.append(key)
+        print(f"{key:<32} {base['best_s']*1000:10.2f}ms {cur['best_s']*1000:10.2f}ms "
+              f"{ratio:6.2f}x {' '.join('⚠️ ' + f for f in flags)}")
+    return regressions
+
+
+def _import_ms(module, repeat):
+    """Best cumulative import time of `module` in a fresh interpreter, plus the modules it loaded."""
+    code = f"import {module}, sys; print(' '.join(sys.modules))"
+    best, loaded = None, set()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                us = int(parts[1])
+                best = us if best is None else min(best, us)
+        loaded = set(proc.stdout.split())
+    return best / 1000, loaded
+
+
+def check_imports(module, repeat, budget_ms):
+    """Print import time vs. budget; return a list of problems (empty = within budget)."""
+    ms, loaded = _import_ms(module, repeat)
+    eager = sorted(m for m in LAZY_MODULES if m in loaded)
+    print(f"import {module:<22} best {ms:8.2f} ms   budget {budget_ms:.0f} ms")
+    print(f"  heavy modules loaded at import: {', '.join(eager) or 'none'}")
+    problems = []
+    if ms > budget_ms:
+        problems.append(f"import {module} took {ms:.1f} ms (> {budget_ms:.0f} ms)")
+    problems += [f"import {module} loads {m} eagerly" for m in eager]
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="PaintPilot benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the benchmark suite")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Room counts to benchmark")
+    p_run.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    p_run.add_argument("--seed", type=int, default=7)
+    p_run.add_argument("--only", nargs="+", help="Subset of cases to run")
+    p_run.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    p_run.add_argument("--out", default=None, help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    p_run.add_argument("--save-baseline", action="store_true", help=f"Also write {BASELINE_PATH}")
+
+    p_cmp = sub.add_parser("compare", help="Flag regressions against a baseline")
+    p_cmp.add_argument("current", help="Result JSON from `run`")
+    p_cmp.add_argument("--baseline", default=str(BASELINE_PATH))
+    p_cmp.add_argument("--time-threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = +25%%)")
+    p_cmp.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed peak-memory growth")
+    p_imp = sub.add_parser("imports", help="Check CLI start-up imports against the budget")
+    p_imp.add_argument("--module", default="main", help="Module to import (default: main.py)")
+    p_imp.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to try (best is kept)")
+    p_imp.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        problems = check_imports(args.module, args.repeat, args.budget_ms)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print("✅ Within the import budget")
+        return 1 if problems else 0
+
+    if args.command == "run":
+        report = run(args.sizes, args.repeat, args.seed, memory=not args.no_memory, only=args.only)
+        out = Path(args.out) if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+        print(f"📁 Results: {out}")
+        if args.save_baseline:
+            BASELINE_PATH.write_text(json.dumps(report, indent=2))
+            print(f"📌 Baseline: {BASELINE_PATH}")
+        return 0
+
+    if not Path(args.baseline).exists():
+        p_cmp.error(f"no baseline at {args.baseline}; run `python -m benchmarks run --save-baseline` "
+                    "on main first, or pass --baseline")
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    regressions = compare(baseline, current, args.time_threshold, args.memory_threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,300 @@
 import argparse
-from src.pdf_processor import mock_room_extraction, extract_metadata
-from src.calculator import process_takeoff
-from src.excel_exporter import generate_workbook
+import os
+import sys
+from contextlib import nullcontext
+from src.config import DEFAULT_CACHE_DIR
+from src.profiling import MEMORY_MODES, Profiler, stage
+from src.resident import DEFAULT_SOCKET, run_remote, serve_resident, socket_path
 
-def main():
-    parser = argparse.ArgumentParser(description='RAD PaintPilot MVP')
-    parser.add_argument('--input', required=True, help='Input PDF path')
+# Pipeline modules (numpy, openpyxl, pdfplumber behind them) are imported by
+# the commands that use them, so `--help`, resident-mode clients and the
+# import-time budget (`python -m benchmarks imports`) don't pay for them.
+
+def _print_progress(done, total, status):
+    if status['ok']:
+        cached = " (cached)" if status.get('cached') else ""
+        print(f"[{done}/{total}] ✅ {status['input']} → {status['output']} "
+              f"({status['rooms']} rooms, {status['seconds']}s){cached}")
+    else:
+        print(f"[{done}/{total}] ❌ {status['input']}: {status['error']}")
+
+def run_batch_mode(args):
+    from src.batch_runner import resolve_inputs, run_batch
+
+    inputs = resolve_inputs(args.batch)
+    if not inputs:
+        print(f"⚠️  No PDFs found for: {args.batch}")
+        return 1
+    print(f"🎨 RAD PaintPilot - Batch of {len(inputs)} plan sets ({args.jobs or 'auto'} workers)...")
+    with stage("run_batch", plan_sets=len(inputs)) as s:
+        statuses = run_batch(
+            inputs,
+            output_dir=args.output_dir,
+            jobs=args.jobs,
+            real_extract=args.real_extract,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            consolidated=args.consolidated,
+            on_progress=_print_progress,
+        )
+        s.count("rooms", sum(r.get('rooms', 0) for r in statuses))
+    failed = [s for s in statuses if not s['ok']]
+    print(f"✅ {len(statuses) - len(failed)} succeeded | ❌ {len(failed)} failed")
+    if args.consolidated:
+        print(f"📊 Consolidated workbook: {args.consolidated}")
+    return 1 if failed else 0
+
+def stream_main(argv):
+    from src.room_stream import DEFAULT_CHUNK_SIZE, INPUT_FORMATS, OUTPUT_FORMATS, detect_format, stream_takeoff
+
+    parser = argparse.ArgumentParser(
+        prog='main.py stream',
+        description='Stream a CSV/NDJSON room list through the takeoff in bounded chunks')
+    parser.add_argument('input', help='Room list (.csv, .tsv, .ndjson/.jsonl, optionally .gz; - for stdin, CSV unless --input-format)')
+    parser.add_argument('--out', required=True, help='Results file (.csv or .parquet; - for stdout CSV)')
+    parser.add_argument('--input-format', choices=INPUT_FORMATS, default=None, help='Override detection by suffix')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=None, help='Override detection by suffix')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rooms computed per chunk')
+    parser.add_argument('--profile', nargs='?', const='output/profile.json', default=None,
+                        help='Time the run and write a Chrome-trace JSON (default: output/profile.json)')
+    args = parser.parse_args(argv)
+    if args.input_format is None and args.input != '-':
+        try:
+            detect_format(args.input, INPUT_FORMATS)
+        except ValueError as e:
+            parser.error(f"{e} (--input-format)")
+
+    # Progress goes to stderr so `--out -` can be piped.
+    def progress(summary):
+        print(f"\r📐 {summary['rooms']:,} rooms ({summary['chunks']} chunks)", end="", file=sys.stderr, flush=True)
+
+    profiler = Profiler() if args.profile else None
+    with profiler.activate() if profiler else nullcontext():
+        with stage("stream_takeoff", chunk_size=args.chunk_size) as s:
+            try:
+                summary = stream_takeoff(args.input, args.out, args.input_format, args.output_format,
+                                         args.chunk_size, on_chunk=progress)
+            except ValueError as e:  # unreadable input (e.g. a JSON array instead of NDJSON)
+                print(f"\n❌ {e}", file=sys.stderr)
+                return 1
+            s.count("rooms", summary['rooms'])
+            if args.out != '-':
+                s.count("bytes_written", os.path.getsize(args.out))
+    print(file=sys.stderr)
+    print(f"✅ {summary['rooms']:,} rooms → {args.out} | skipped {summary['skipped']:,} rows | "
+          f"net {summary['net_area']:,.2f} sf | {summary['total_gallons']:,.2f} gal | {summary['rolls']:,.1f} rolls",
+          file=sys.stderr)
+    if profiler:
+        print(profiler.format_table(), file=sys.stderr)
+        print(f"🧭 Trace written to: {profiler.write(args.profile)}", file=sys.stderr)
+    return 0
+
+def serve_main(argv):
+    from src.job_service import DEFAULT_MAX_QUEUED, DEFAULT_WORK_DIR, JobService, serve
+
+    parser = argparse.ArgumentParser(
+        prog='main.py serve',
+        description='Run the local takeoff job service (HTTP API over a worker pool)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='Concurrent takeoff jobs (default: CPU count)')
+    parser.add_argument('--max-queued', type=int, default=DEFAULT_MAX_QUEUED,
+                        help='Jobs allowed to wait for a worker; beyond this POST /jobs returns 429')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='Directory for uploads and job artifacts')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory for cached extraction/takeoff results')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-extract and recalculate')
+    args = parser.parse_args(argv)
+
+    with JobService(workers=args.workers, max_queued=args.max_queued, work_dir=args.work_dir,
+                    cache_dir=None if args.no_cache else args.cache_dir) as service:
+        server = serve(service, args.host, args.port)
+        print(f"🎨 RAD PaintPilot job service on http://{args.host}:{server.server_address[1]}/jobs "
+              f"({service.workers} workers, queue {service.max_queued})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    return 0
+
+def resident_main(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py resident',
+        description='Keep a warm process that runs main.py commands sent over a local socket')
+    parser.add_argument('--socket', default=socket_path() or DEFAULT_SOCKET,
+                        help=f'Unix socket path (default: ${{PAINTPILOT_SOCKET}} or {DEFAULT_SOCKET})')
+    parser.add_argument('--stop', action='store_true', help='Stop the server listening on --socket')
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        if run_remote([], args.socket, stop=True) is None:
+            print(f"⚠️  No resident server on {args.socket}")
+            return 1
+        print(f"🛑 Stopped resident server on {args.socket}")
+        return 0
+    print(f"🔥 RAD PaintPilot resident on {args.socket} (export PAINTPILOT_SOCKET={args.socket} to use it)")
+    serve_resident(args.socket, run_command)
+    return 0
+
+SUBCOMMANDS = {'stream': stream_main, 'serve': serve_main}
+# Never forwarded to a resident server: `serve` would block its request loop.
+LOCAL_ONLY = ('serve',)
+
+def _forwardable(argv) -> bool:
+    """Whether a resident server can run `argv` (the server has its own stdin, not ours)."""
+    if argv[:1] and argv[0] in LOCAL_ONLY:
+        return False
+    return not any(arg == '-' and prev != '--out' for prev, arg in zip([None] + argv, argv))
+
+def main(argv=None):
+    """Entry point; forwards to a resident server when $PAINTPILOT_SOCKET names a live one."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['resident']:
+        return resident_main(argv[1:])
+    status = run_remote(argv) if _forwardable(argv) else None
+    if status is not None:
+        return status
+    return run_command(argv)
+
+def run_command(argv):
+    if argv[:1] and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description='RAD PaintPilot MVP',
+        epilog='Subcommands: "main.py stream ROOMS --out RESULTS" streams a CSV/NDJSON room list; '
+               '"main.py serve" runs the local job service; "main.py resident" keeps a warm process '
+               'for successive commands.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help='Input PDF path')
+    source.add_argument('--batch', help='Directory, glob or manifest (.txt/.json) of PDFs to process')
     parser.add_argument('--output', default='output/bid_package.xlsx', help='Output Excel path')
-    args = parser.parse_args()
+    parser.add_argument('--real-extract', action='store_true', help='Parse room schedules from the PDF instead of demo rooms')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for PDF parsing (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory for cached extraction/takeoff results')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-extract and recalculate')
+    parser.add_argument('--output-dir', default='output', help='Batch mode: directory for per-project workbooks')
+    parser.add_argument('--jobs', type=int, default=None, help='Batch mode: concurrent plan sets (default: CPU count)')
+    parser.add_argument('--consolidated', default=None, help='Batch mode: also write one workbook covering every project')
+    parser.add_argument('--alternates', default=None,
+                        help='JSON of what-if scenarios (overrides grid, prices); adds an "Alternates" sheet')
+    parser.add_argument('--typical-floors', action='store_true',
+                        help='List repeated floors and identical rooms once, with a multiplier, in the workbook')
+    parser.add_argument('--profile', nargs='?', const='output/profile.json', default=None,
+                        help='Time each stage and write a Chrome-trace JSON (default: output/profile.json)')
+    parser.add_argument('--profile-memory', choices=MEMORY_MODES, default='rss',
+                        help='With --profile: peak memory via process RSS (cheap), tracemalloc (exact, slow) or off')
+    args = parser.parse_args(argv)
+
+    profiler = Profiler(memory=args.profile_memory) if args.profile else None
+    with profiler.activate() if profiler else nullcontext():
+        status = run_batch_mode(args) if args.batch else run_single(args)
+    if profiler:
+        print("⏱️  Stage timings:")
+        print(profiler.format_table())
+        print(f"🧭 Trace written to: {profiler.write(args.profile)}")
+    return status
+
+def print_rollup(rollup):
+    """Per-system totals and the floor count, from the takeoff's rollup."""
+    from src.finish_systems import FIELD_LABELS, REGISTRY
+
+    total = rollup.grand_total()
+    floors = len(rollup.by("floor"))
+    print(f"🧮 {total['rooms']} room(s) on {floors} floor(s) | Net area: {total['net_area']:,.2f} sf")
+    for row in rollup.by("system"):
+        system = REGISTRY.get(row["system"])
+        quantities = ", ".join(f"{FIELD_LABELS[f]}: {row[f]:,}" for f in system.fields)
+        print(f"   • {system.label}: {row['rooms']} room(s), {row['net_area']:,.2f} sf | {quantities}")
+
+def print_alternates(alternates, limit=10):
+    """Base plus the first `limit` alternates (with their overrides) and their difference from the base."""
+    for a in alternates[:limit + 1]:
+        cost = f" | ${a['cost']:,.2f} ({a['delta_cost']:+,.2f})" if a['cost'] is not None else ""
+        # Grid alternates are only numbered ("Alt 4"); say what they change.
+        changes = f" ({a['changes']})" if a['changes'] and a['changes'] != a['scenario'] else ""
+        print(f"   ↳ {a['scenario']}{changes}: {a['total_gallons']:,} gal ({a['delta_total_gallons']:+,}), "
+              f"{a['rolls']:,} rolls ({a['delta_rolls']:+,}){cost}")
+    if len(alternates) > limit + 1:
+        print(f"   ... {len(alternates) - limit - 1} more in the Alternates sheet")
+
+def run_single(args):
+    from src.pdf_processor import mock_room_extraction, extract_metadata, extract_rooms_from_pdf
+    from src.calculator import process_takeoff
+    from src.excel_exporter import generate_workbook
+    from src.takeoff_cache import TakeoffCache, cache_key
 
     print("🎨 RAD PaintPilot - Processing...")
     print("📄 Analyzing floor plans...")
-    meta = extract_metadata(args.input)
-    rooms_data = mock_room_extraction(args.input)
+    cache = None if args.no_cache else TakeoffCache(args.cache_dir)
+    with stage("extract_metadata") as s:
+        meta = extract_metadata(args.input, cache)
+        s.count("pages", meta["pages"])
+    if meta["page_index"]:
+        counts = meta["page_index"]["counts"]
+        schedules = counts.get("room_schedule", 0) + counts.get("finish_schedule", 0)
+        print(f"   {meta['pages']} page(s), {schedules} schedule page(s)")
+    with stage("cache_lookup") as s:
+        key = cache_key(args.input, 'pdfplumber' if args.real_extract else 'mock') if cache else None
+        cached = cache.get(key) if cache else None
+        s.count("hit", int(bool(cached)))
+
+    if cached:
+        print("⚡ Unchanged plan set - reusing cached takeoff")
+        rooms_data, results = cached
+    else:
+        with stage("extract_rooms") as s:
+            if args.real_extract:
+                rooms_data = extract_rooms_from_pdf(args.input, workers=args.workers,
+                                                    page_index=meta["page_index"])
+            else:
+                rooms_data = mock_room_extraction(args.input)
+            s.count("rooms", len(rooms_data.get('rooms', [])))
+
+        print("📐 Calculating quantities...")
+        with stage("process_takeoff") as s:
+            results = process_takeoff(rooms_data)
+            s.count("rooms", len(results))
+        if cache:
+            with stage("cache_store"):
+                cache.put(key, rooms_data, results)
+
+    with stage("rollup"):
+        rollup = results.rollup(rooms_data.get('project'), rooms_data.get('floor'))
+
+    export, export_rollup = results, rollup
+    if args.typical_floors:
+        from src.typical import collapse
+
+        with stage("typical_floors") as s:
+            export = collapse(results)
+            export_rollup = export.rollup(rooms_data.get('project'), rooms_data.get('floor'))
+            s.count("rows", len(export))
+        print(f"🏢 {len(export.groups)} floor group(s): {len(results)} rooms in {len(export)} breakdown row(s)")
+        for group in export.groups:
+            if group.multiplier > 1:
+                print(f"   ↳ {group.label}")
+
+    alternates = None
+    if args.alternates:
+        from src.scenarios import evaluate_scenarios, load_scenarios
 
-    print("📐 Calculating quantities...")
-    results = process_takeoff(rooms_data)
+        scenarios, prices = load_scenarios(args.alternates)
+        print(f"🔀 Evaluating {len(scenarios)} alternate(s)...")
+        with stage("alternates") as s:
+            alternates = evaluate_scenarios(results, scenarios, prices)
+            s.count("scenarios", len(alternates))
 
     print("📊 Generating bid package...")
-    output_path = generate_workbook(results, args.output)
+    with stage("generate_workbook") as s:
+        output_path = generate_workbook(export, args.output, rollup=export_rollup, alternates=alternates)
+        s.count("bytes_written", os.path.getsize(output_path))
 
     print(f"✅ Complete! Saved to: {output_path}")
     print(f"📁 Project: {rooms_data.get('project')} | Floor: {rooms_data.get('floor')}")
+    print_rollup(rollup)
+    if alternates:
+        print_alternates(alternates)
     # Demo ROI callout
     saved_hours = 3.5
     rate = 55
@@ -29,4 +302,4 @@ def main():
     print(f"💵 ROI (demo): ~${saved_hours * rate:.2f} (@ ${rate}/hr)")
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -1,9 +1,199 @@
+"""Generate local test plan sets with a real, ruled room finish schedule.
+
+    python scripts/make_sample_pdf.py                      # 8 demo rooms, 1 page
+    python scripts/make_sample_pdf.py --floors 30 --rooms-per-floor 40 \
+        --out data/sample_plans/tower.pdf                 # synthetic high-rise
+    python scripts/make_sample_pdf.py --floors 30 --sheets-per-floor 4 \
+        --out data/sample_plans/tower_set.pdf             # plus plans, elevations, specs
+    python scripts/make_sample_pdf.py --floors 30 --typical \
+        --out data/sample_plans/tower_typical.pdf         # floors 2-29 identical
+
+The PDF is written by hand (no extra dependencies) so `pdfplumber` sees real
+text and ruling lines, the same way it would on an exported CAD schedule.
+"""
+import argparse
+import sys
 from pathlib import Path
 
-# Tiny placeholder PDF so the CLI has an input file path for the demo
-pdf_bytes = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj\n<< /Type /Catalog >>\nendobj\ntrailer\n<<>>\n%%EOF\n"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.pdf_processor import mock_room_extraction  # noqa: E402
+from src.synthetic import synthetic_project  # noqa: E402
+
+PAGE_W, PAGE_H = 792, 612          # US Letter, landscape
+ROWS_PER_PAGE = 24
+ROW_H = 18
+COLUMNS = [("ROOM", 60), ("NAME", 170), ("LENGTH", 70), ("WIDTH", 70),
+           ("HEIGHT", 70), ("DOORS", 60), ("WINDOWS", 70), ("FINISH", 110)]
+
+
+def _ft_in(value) -> str:
+    feet = int(value)
+    inches = round((float(value) - feet) * 12)
+    return f"{feet}'-{inches}\""
+
+
+def _esc(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(project: str, floor: str, rooms) -> bytes:
+    ops = ["0.5 w"]
+    x0, y = 36, PAGE_H - 40
+    for line, size in ((f"PROJECT: {project}", 12), (f"FLOOR: {floor}", 11), ("ROOM FINISH SCHEDULE", 11)):
+        ops.append(f"BT /F1 {size} Tf {x0} {y} Td ({_esc(line)}) Tj ET")
+        y -= 18
+    top = y - 6
+    table_w = sum(w for _, w in COLUMNS)
+    n_rows = len(rooms) + 1
+    for i in range(n_rows + 1):
+        yy = top - i * ROW_H
+        ops.append(f"{x0} {yy} m {x0 + table_w} {yy} l S")
+    xx = x0
+    for _, w in COLUMNS + [("", 0)]:
+        ops.append(f"{xx} {top} m {xx} {top - n_rows * ROW_H} l S")
+        xx += w
+    rows = [[c for c, _ in COLUMNS]]
+    for r in rooms:
+        rows.append([r["id"], r["name"], _ft_in(r["length"]), _ft_in(r["width"]),
+                     _ft_in(r["height"]), r["doors"], r["windows"], r["finish_type"].upper()])
+    for i, row in enumerate(rows):
+        yy = top - (i + 1) * ROW_H + 5
+        xx = x0
+        for (_, w), cell in zip(COLUMNS, row):
+            ops.append(f"BT /F1 9 Tf {xx + 4} {yy} Td ({_esc(cell)}) Tj ET")
+            xx += w
+    return "\n".join(ops).encode("latin-1")
+
+
+def _title_ops(project: str, title: str):
+    return [f"BT /F1 12 Tf 36 {PAGE_H - 40} Td ({_esc('PROJECT: ' + project)}) Tj ET",
+            f"BT /F1 11 Tf 36 {PAGE_H - 58} Td ({_esc(title)}) Tj ET"]
+
+
+def _plan_stream(project: str, floor: str, rooms) -> bytes:
+    """Floor plan sheet: one ruled rectangle per room with its number and name."""
+    ops = ["0.5 w"] + _title_ops(project, f"{floor.upper()} FLOOR PLAN")
+    cols = 8
+    cell_w, cell_h = (PAGE_W - 72) / cols, 60
+    for i, r in enumerate(rooms):
+        x = 36 + (i % cols) * cell_w
+        y = PAGE_H - 140 - (i // cols) * cell_h
+        ops.append(f"{x:.1f} {y:.1f} {cell_w - 6:.1f} {cell_h - 6:.1f} re S")
+        ops.append(f"BT /F1 8 Tf {x + 4:.1f} {y + cell_h - 18:.1f} Td ({_esc(r['id'])}) Tj ET")
+        ops.append(f"BT /F1 7 Tf {x + 4:.1f} {y + cell_h - 30:.1f} Td ({_esc(r['name'])}) Tj ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _elevation_stream(project: str, floor: str) -> bytes:
+    """Interior elevation sheet: wall outlines with door and window openings."""
+    ops = ["0.5 w"] + _title_ops(project, f"{floor.upper()} INTERIOR ELEVATIONS")
+    for k in range(4):
+        x, y = 36 + k * 186, 300
+        ops.append(f"{x} {y} 170 120 re S")
+        ops.append(f"{x + 20} {y} 36 84 re S")
+        ops.append(f"{x + 90} {y + 50} 60 40 re S")
+        ops.append(f"BT /F1 8 Tf {x} {y - 14} Td (ELEVATION {k + 1} - PT-1 EGGSHELL) Tj ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+SPEC_TEXT = (
+    "SECTION 09 91 23 - INTERIOR PAINTING",
+    "PART 1 - GENERAL",
+    "1.1 SUMMARY: Surface preparation and field painting of exposed interior items and surfaces.",
+    "1.2 SUBMITTALS: Product data for each paint system specified, including block fillers and primers.",
+    "PART 2 - PRODUCTS",
+    "2.1 Provide materials for use within each paint system that are compatible with one another.",
+    "2.2 Interior latex, institutional low odor, eggshell (MPI gloss level 3).",
+    "PART 3 - EXECUTION",
+    "3.1 Apply paints according to manufacturer's written instructions.",
+    "3.2 Do not apply paint over dirt, rust, scale, grease, moisture or conditions detrimental to coating.",
+    "3.3 Apply each coat to uniform appearance; touch up and restore damaged or defaced painted surfaces.",
+)
+
+
+def _spec_stream(project: str) -> bytes:
+    """Specification sheet: plain text, no tables."""
+    ops = _title_ops(project, "SPECIFICATIONS")
+    y = PAGE_H - 90
+    for _ in range(3):
+        for line in SPEC_TEXT:
+            ops.append(f"BT /F1 9 Tf 36 {y} Td ({_esc(line)}) Tj ET")
+            y -= 14
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_schedule_pdf(out: Path, project: str, floors, sheets_per_floor: int = 0) -> None:
+    """Write one or more schedule pages; `floors` is a list of (floor, rooms).
+
+    `sheets_per_floor` adds that many non-schedule sheets after each floor's
+    schedule (cycling floor plan, elevations, specifications), like a real
+    plan set.
+    """
+    pages = []
+    for floor, rooms in floors:
+        for i in range(0, max(len(rooms), 1), ROWS_PER_PAGE):
+            pages.append(_page_stream(project, floor, rooms[i:i + ROWS_PER_PAGE]))
+        sheets = (lambda: _plan_stream(project, floor, rooms), lambda: _elevation_stream(project, floor),
+                  lambda: _spec_stream(project))
+        for k in range(sheets_per_floor):
+            pages.append(sheets[k % len(sheets)]())
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for stream in pages:
+        content_id = len(objects) + 1
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(len(objects) + 1)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                        "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                        % (PAGE_W, PAGE_H, content_id)).encode())
+    objects[1] = ("<< /Type /Pages /Kids [%s] /Count %d >>"
+                  % (" ".join(f"{k} 0 R" for k in kids), len(kids))).encode()
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("wb") as f:
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for num, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for off in offsets:
+            f.write(b"%010d 00000 n \n" % off)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def synthetic_floors(n_floors: int, rooms_per_floor: int, seed: int = 7, typical: bool = False):
+    """(floor, rooms) pairs from the seeded generator in src/synthetic.py."""
+    floors = {}
+    for room in synthetic_project(n_floors, rooms_per_floor, seed, typical=typical)["rooms"]:
+        floors.setdefault(room["floor"], []).append(room)
+    return list(floors.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sample plan-set PDFs")
+    parser.add_argument("--out", default="data/sample_plans/office_2ndfloor.pdf")
+    parser.add_argument("--floors", type=int, default=0, help="Synthetic floors (0 = demo rooms)")
+    parser.add_argument("--rooms-per-floor", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sheets-per-floor", type=int, default=0,
+                        help="Floor plan / elevation / spec sheets added after each floor's schedule")
+    parser.add_argument("--typical", action="store_true",
+                        help="Repeat floor 2 up to the top floor (typical floors)")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    if args.floors:
+        floors = synthetic_floors(args.floors, args.rooms_per_floor, args.seed, args.typical)
+        write_schedule_pdf(out, "Synthetic Tower", floors, args.sheets_per_floor)
+    else:
+        demo = mock_room_extraction(None)
+        write_schedule_pdf(out, demo["project"], [(demo["floor"], demo["rooms"])], args.sheets_per_floor)
+    print(f"Created sample PDF at: {out.resolve()}")
+
 
-out = Path("data/sample_plans/office_2ndfloor.pdf")
-out.parent.mkdir(parents=True, exist_ok=True)
-out.write_bytes(pdf_bytes)
-print(f"Created placeholder PDF at: {out.resolve()}")
+if __name__ == "__main__":
+    main()
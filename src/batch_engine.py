@@ -0,0 +1,92 @@
+"""Columnar takeoff engine: computes every room in a few NumPy array operations.
+
+Results match the per-room helpers in `src/calculator.py` exactly, including
+Python's round-half-even behaviour at 2/1 decimal places.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from src.finish_systems import FIELD_DECIMALS, QUANTITY_FIELDS, REGISTRY, FinishRegistry
+from src.geometry import pack_geometry, wall_areas
+
+# The `finish` column holds registry codes (positions in REGISTRY.names);
+# unknown finish types map to paint, like `calculate_materials`.
+_finish_code = REGISTRY.code
+
+
+def rooms_to_columns(rooms: Iterable[Dict]) -> Dict[str, np.ndarray]:
+    """Pack room dicts into length/width/height/doors/windows/finish columns.
+
+    Rooms with an outline, wall heights or explicit openings add the
+    `geometry.pack_geometry` columns.
+    """
+    rooms = rooms if isinstance(rooms, list) else list(rooms)
+    n = len(rooms)
+    columns = {
+        'length': np.fromiter((r['length'] for r in rooms), dtype=np.float64, count=n),
+        'width': np.fromiter((r['width'] for r in rooms), dtype=np.float64, count=n),
+        'height': np.fromiter((r['height'] for r in rooms), dtype=np.float64, count=n),
+        'doors': np.fromiter((int(r.get('doors', 0)) for r in rooms), dtype=np.int64, count=n),
+        'windows': np.fromiter((int(r.get('windows', 0)) for r in rooms), dtype=np.int64, count=n),
+        'finish': np.fromiter((_finish_code(r.get('finish_type', 'paint')) for r in rooms), dtype=np.int16, count=n),
+    }
+    columns.update(pack_geometry(rooms))
+    return columns
+
+
+def _two_product(a: np.ndarray, b: float):
+    """Dekker/Veltkamp error-free product: a * b == p + err exactly."""
+    p = a * b
+    t = a * 134217729.0  # 2**27 + 1
+    a_hi = t - (t - a)
+    a_lo = a - a_hi
+    t = b * 134217729.0
+    b_hi = t - (t - b)
+    b_lo = b - b_hi
+    err = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, err
+
+
+def round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Vectorized `round(x, ndigits)` that agrees with the builtin bit-for-bit.
+
+    `np.round` scales by 10**ndigits before rounding, so values sitting on a
+    half-way boundary can land on the wrong side of it. For those values the
+    exact scaled product is compared against the midpoint, breaking true ties
+    to even like the builtin does.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    out = np.round(values, ndigits)
+    scaled, err = _two_product(values, scale)
+    low = np.floor(scaled)
+    near_half = np.abs(scaled - low - 0.5) < 1e-6
+    if near_half.any():
+        low, scaled, err = low[near_half], scaled[near_half], err[near_half]
+        # scaled - (low + 0.5) is exact here (Sterbenz), so the sign of the
+        # sum below is the sign of the exact distance from the midpoint.
+        side = (scaled - (low + 0.5)) + err
+        tie_up = (side == 0) & (np.fmod(low, 2) != 0)
+        out[near_half] = (low + ((side > 0) | tie_up)) / scale
+    return out
+
+
+def compute_takeoff(columns: Dict[str, np.ndarray], registry: FinishRegistry = REGISTRY) -> Dict[str, np.ndarray]:
+    """Gross/net area and material quantities for every room at once.
+
+    Quantity columns are NaN where a room's finish system has no such field
+    (e.g. gallons on wallcovering rooms), so each row carries only the
+    quantities of its own system.
+    """
+    gross, net = wall_areas(columns)
+    quantities = registry.quantities(net, columns['finish'], columns['height'])
+    out = {
+        'gross_area': round_like_python(gross, 2),
+        'net_area': round_like_python(net, 2),
+    }
+    for field in QUANTITY_FIELDS:
+        out[field] = round_like_python(quantities[field], FIELD_DECIMALS[field])
+    out['finish'] = columns['finish']
+    return out
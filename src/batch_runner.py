@@ -0,0 +1,153 @@
+"""Batch mode: run extraction -> process_takeoff -> generate_workbook over many PDFs.
+
+Plan sets are fanned out to a process pool. One failing file is reported
+and skipped; it never aborts the rest of the batch.
+"""
+
+import glob
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.calculator import process_takeoff
+from src.excel_exporter import generate_workbook
+from src.pdf_processor import extract_rooms_from_pdf, mock_room_extraction
+from src.rollups import Rollup
+from src.takeoff_cache import TakeoffCache, cache_key
+
+MANIFEST_SUFFIXES = {".txt", ".lst", ".json"}
+
+
+def resolve_inputs(source: str) -> List[Path]:
+    """Expand a directory, a glob pattern, or a manifest file into PDF paths.
+
+    Manifests are either text (one path per line, `#` comments) or a JSON
+    list; relative entries resolve against the manifest's directory.
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+    if path.is_file() and path.suffix.lower() in MANIFEST_SUFFIXES:
+        if path.suffix.lower() == ".json":
+            entries = json.loads(path.read_text())
+        else:
+            lines = (line.strip() for line in path.read_text().splitlines())
+            entries = [line for line in lines if line and not line.startswith("#")]
+        return [p if p.is_absolute() else path.parent / p for p in map(Path, entries)]
+    if glob.has_magic(source):
+        return sorted(Path(p) for p in glob.glob(source, recursive=True))
+    return [path]
+
+
+def _output_paths(inputs: List[Path], output_dir: Path) -> List[Path]:
+    used = set()
+    outputs = []
+    for pdf in inputs:
+        name, n = pdf.stem, 1
+        while name in used:
+            n += 1
+            name = f"{pdf.stem}-{n}"
+        used.add(name)
+        outputs.append(output_dir / f"{name}.xlsx")
+    return outputs
+
+
+def _totals(rollup: Rollup) -> Dict:
+    total = rollup.grand_total()
+    return {k: total[k] for k in ("rooms", "net_area", "total_gallons", "rolls")}
+
+
+def run_one(job: Dict) -> Dict:
+    """Worker entry point for one plan set; never raises."""
+    started = time.perf_counter()
+    status = {"input": str(job["input"]), "output": str(job["output"]), "ok": False}
+    try:
+        cache = TakeoffCache(job["cache_dir"]) if job["cache_dir"] else None
+        key = cache_key(job["input"], 'pdfplumber' if job["real_extract"] else 'mock') if cache else None
+        cached = cache.get(key) if cache else None
+        if cached:
+            rooms_data, results = cached
+        else:
+            if job["real_extract"]:
+                # One process per plan set already; don't nest another pool.
+                rooms_data = extract_rooms_from_pdf(job["input"], workers=1, cache=cache)
+            else:
+                rooms_data = mock_room_extraction(job["input"])
+            results = process_takeoff(rooms_data)
+            if cache:
+                cache.put(key, rooms_data, results)
+        # Cached on `results`, so it travels back with them for consolidated runs.
+        rollup = results.rollup(rooms_data.get("project"), rooms_data.get("floor"))
+        generate_workbook(results, job["output"], rollup=rollup)
+        status.update(
+            ok=True,
+            cached=bool(cached),
+            project=rooms_data.get("project"),
+            floor=rooms_data.get("floor"),
+            **_totals(rollup),
+        )
+        if job["keep_results"]:
+            status["results"] = results
+        if job.get("keep_rooms"):
+            status["rooms_data"] = rooms_data
+    except Exception as exc:
+        status["error"] = f"{type(exc).__name__}: {exc}"
+        status["traceback"] = traceback.format_exc()
+    status["seconds"] = round(time.perf_counter() - started, 3)
+    return status
+
+
+def run_batch(
+    inputs: List[Path],
+    output_dir="output",
+    jobs: Optional[int] = None,
+    real_extract: bool = False,
+    cache_dir: Optional[str] = None,
+    consolidated: Optional[str] = None,
+    on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+) -> List[Dict]:
+    """Process every input across `jobs` worker processes.
+
+    Returns one status dict per input, in input order. With `consolidated`,
+    also writes a single workbook covering every successful plan set.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        {
+            "input": str(pdf),
+            "output": str(out),
+            "real_extract": real_extract,
+            "cache_dir": cache_dir,
+            "keep_results": bool(consolidated),
+        }
+        for pdf, out in zip(inputs, _output_paths(inputs, output_dir))
+    ]
+
+    statuses: List[Optional[Dict]] = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_one, task): i for i, task in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                status = future.result()
+            except Exception as exc:  # worker crashed (e.g. killed, BrokenProcessPool)
+                status = {"input": tasks[i]["input"], "output": tasks[i]["output"], "ok": False,
+                          "error": f"{type(exc).__name__}: {exc}"}
+            statuses[i] = status
+            if on_progress:
+                on_progress(done, len(tasks), status)
+
+    if consolidated:
+        ok = [s for s in statuses if s["ok"]]
+        rollup = Rollup.concat([s["results"].rollup(s["project"], s["floor"]) for s in ok])
+        generate_workbook(
+            (r for s in ok for r in s.pop("results")),
+            consolidated,
+            projects=[{k: s[k] for k in ("project", "floor", "input", "rooms", "net_area", "total_gallons", "rolls")} for s in ok],
+            rollup=rollup,
+        )
+    return statuses
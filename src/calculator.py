@@ -1,12 +1,14 @@
 from typing import Dict, List
 from src.config import STANDARD_OPENINGS
-from src.finish_systems import (
-    calculate_paint_materials,
-    calculate_wallcovering_materials,
-)
+from src.batch_engine import compute_takeoff, rooms_to_columns
+from src.models import Materials, Room, TakeoffResult, TakeoffResults, room_columns
+from src.finish_systems import REGISTRY
+from src.geometry import has_geometry, wall_areas
 
 def calculate_wall_area(room: Dict) -> float:
-    """Gross wall area in sq ft: perimeter * height."""
+    """Gross wall area in sq ft: perimeter * height (each outline wall with its own height)."""
+    if has_geometry(room):
+        return float(wall_areas(rooms_to_columns([room]))[0][0])
     L = float(room['length'])
     W = float(room['width'])
     H = float(room['height'])
@@ -22,27 +24,33 @@ def subtract_openings(gross_area: float, doors: int, windows: int) -> float:
     net_area = gross - door_area - window_area
     return max(0.0, net_area)
 
-def calculate_materials(net_area: float, finish_type: str):
-    """Dispatch to the appropriate system calc."""
-    ft = (finish_type or '').lower()
-    if ft == 'paint':
-        return {'type': 'paint', **calculate_paint_materials(net_area)}
-    if ft == 'wallcovering':
-        return {'type': 'wallcovering', **calculate_wallcovering_materials(net_area)}
-    # default
-    return {'type': 'paint', **calculate_paint_materials(net_area)}
+def calculate_materials(net_area: float, finish_type: str, height: float = None):
+    """Materials for one room from the finish-system registry (unknown types -> paint).
 
-def process_takeoff(rooms_data: Dict) -> List[Dict]:
-    """Main calculation engine across rooms."""
-    results = []
-    for room in rooms_data.get('rooms', []):
+    `height` only matters for systems with a pattern repeat.
+    """
+    return REGISTRY.materials(net_area, finish_type, height)
+
+def calculate_room(room: Dict) -> TakeoffResult:
+    """One room's takeoff result; same numbers as `process_takeoff`."""
+    room = Room.from_mapping(room)
+    if has_geometry(room):
+        gross, net = (float(a[0]) for a in wall_areas(room_columns([room])))
+    else:
         gross = calculate_wall_area(room)
-        net = subtract_openings(gross, room.get('doors', 0), room.get('windows', 0))
-        materials = calculate_materials(net, room.get('finish_type', 'paint'))
-        results.append({
-            'room': room,
-            'gross_area': round(gross, 2),
-            'net_area': round(net, 2),
-            'materials': materials,
-        })
-    return results
+        net = subtract_openings(gross, room.doors, room.windows)
+    return TakeoffResult(
+        room,
+        round(gross, 2),
+        round(net, 2),
+        Materials(**calculate_materials(net, room.finish_type, room.height)),
+    )
+
+def process_takeoff(rooms_data: Dict) -> TakeoffResults:
+    """Main calculation engine across rooms (columnar batch under the hood).
+
+    Returns a struct-of-arrays `TakeoffResults`; each item still indexes like
+    the legacy `{'room', 'gross_area', 'net_area', 'materials'}` dict.
+    """
+    rooms = [Room.from_mapping(r) for r in rooms_data.get('rooms', [])]
+    return TakeoffResults(rooms, compute_takeoff(room_columns(rooms)))
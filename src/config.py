@@ -13,11 +13,30 @@ STANDARD_OPENINGS = {
 }
 
 # Coverage assumptions
-# paint coverage in sq ft per gallon, wallcovering in sq ft per roll
+# Each finish system lists its products once; src/finish_systems.py compiles
+# them into a coefficient table. Product fields: primer_gallons,
+# finish_gallons (sq ft per gallon) or rolls (sq ft per roll). Optional per
+# product: coats (default 1), waste (fraction, default 0), pattern_repeat_in
+# (wallcovering pattern repeat, adds one repeat of waste per drop).
 FINISH_SYSTEMS = {
     "paint": {
-        "primer": {"coats": 1, "coverage": 400},
-        "finish": {"coats": 2, "coverage": 400},
+        "label": "Paint",
+        "products": [
+            {"field": "primer_gallons", "name": "Primer", "coats": 1, "coverage": 400},
+            {"field": "finish_gallons", "name": "Finish", "coats": 2, "coverage": 400},
+        ],
+        "total": "total_gallons",
+    },
+    "wallcovering": {
+        "label": "Wallcovering",
+        "products": [{"field": "rolls", "name": "Wallcovering", "coverage": 30}],  # sq ft per roll
+        "aliases": ["wall covering", "vinyl", "wc"],
     },
-    "wallcovering": {"coverage": 30},  # sq ft per roll
 }
+
+# Extra finish systems (JSON, same shape as FINISH_SYSTEMS) loaded on top of
+# the built-ins; override the path with $PAINTPILOT_FINISH_SYSTEMS.
+FINISH_SYSTEMS_FILE = "config/finish_systems.json"
+
+# On-disk takeoff cache (src/takeoff_cache.py); main.py / app.py default
+DEFAULT_CACHE_DIR = ".paintpilot_cache"
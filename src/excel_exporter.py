@@ -1,108 +1,300 @@
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
+import io
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import islice
+
+# openpyxl is imported when a workbook is written, not at import time; it is
+# the slowest import on the CLI path and most runs touch it once at the end.
+from src.finish_systems import FIELD_DECIMALS, FIELD_LABELS, QUANTITY_FIELDS, REGISTRY, TOTAL_KEYS
+from src.models import TakeoffResults
+from src.rollups import Rollup
+from src.typical import TypicalResults, collapse
+
+# Above this many rooms generate_workbook switches to the write-only writer.
+STREAMING_THRESHOLD = 5000
+
+SUMMARY_HEADERS = ["Metric", "Value"]
+ROOM_BREAKDOWN_HEADERS = [
+    "Room ID","Name","L (ft)","W (ft)","H (ft)",
+    "Doors","# Windows","Finish Type",
+    "Gross Area (sf)","Net Area (sf)",
+    "Primer (gal)","Finish (gal)","Total (gal)","Rolls"
+]
+# Typical-floor breakdown: the floor group and how many rooms each row stands for
+TYPICAL_BREAKDOWN_HEADERS = ["Floors","×"] + ROOM_BREAKDOWN_HEADERS
+PROJECT_HEADERS = ["Project","Floor","Source","Rooms","Net Area (sf)","Total (gal)","Rolls"]
+SYSTEM_BREAKDOWN_HEADERS = ["System","Rooms","#","Net Area (sf)","Primer (gal)","Finish (gal)","Total (gal)","Rolls"]
+ROLLUP_HEADERS = ["Level","Project","Floor","Room Type","System","Rooms",
+                  "Gross Area (sf)","Net Area (sf)","Primer (gal)","Finish (gal)","Total (gal)","Rolls"]
+ALTERNATES_HEADERS = ["Scenario","Changes","Primer (gal)","Finish (gal)","Total (gal)","Rolls","Cost ($)",
+                      "Δ Total (gal)","Δ Rolls","Δ Cost ($)"]
+# Width of the Floors column ("Floor 3–22 (typical) ×20")
+FLOOR_GROUP_WIDTH = 30
+# Rooms per chunk when an iterator of results is rolled up while streaming
+ROLLUP_CHUNK = 5000
+
+# Systems always listed in Summary / System Breakdown; others appear once used.
+BASE_SYSTEMS = ("paint", "wallcovering")
+
+@lru_cache(maxsize=None)
+def _header_style():
+    """Shared (font, fill, alignment): created once, reused by every header cell."""
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    return (Font(bold=True), PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"),
+            Alignment(horizontal="center"))
 
 def _header(ws, titles, row=1):
+    from openpyxl.utils import get_column_letter
+
+    font, fill, alignment = _header_style()
     for i, title in enumerate(titles, start=1):
         cell = ws.cell(row=row, column=i, value=title)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-        cell.alignment = Alignment(horizontal="center")
+        cell.font = font
+        cell.fill = fill
+        cell.alignment = alignment
         ws.column_dimensions[get_column_letter(i)].width = max(14, len(title) + 2)
 
-def create_summary_sheet(wb, results):
-    ws = wb.create_sheet("Summary", 0)
-    _header(ws, ["Metric", "Value"])
-    total_net = primer = finish = gallons = rolls = 0.0
-    paint_rooms = wc_rooms = 0
-
-    for r in results:
-        total_net += r['net_area']
-        m = r['materials']
-        if m['type'] == 'paint':
-            primer += m.get('primer_gallons', 0.0)
-            finish += m.get('finish_gallons', 0.0)
-            gallons += m.get('total_gallons', 0.0)
-            paint_rooms += 1
-        else:
-            rolls += m.get('rolls', 0.0)
-            wc_rooms += 1
-
-    data = [
-        ["Total Net Area (sf)", round(total_net, 2)],
-        ["Paint – Primer Gallons", round(primer, 2)],
-        ["Paint – Finish Gallons", round(finish, 2)],
-        ["Paint – Total Gallons", round(gallons, 2)],
-        ["Wallcovering – Rolls", round(rolls, 1)],
-        ["# Paint Rooms", paint_rooms],
-        ["# Wallcovering Rooms", wc_rooms],
+def _stream_header(ws, titles, widths=None):
+    """Write-only counterpart of `_header`: widths first, then one styled row.
+
+    `widths` ({column letter: width}) overrides the header-based widths; a
+    write-only sheet ignores widths set after its first row.
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    font, fill, alignment = _header_style()
+    cells = []
+    for i, title in enumerate(titles, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = max(14, len(title) + 2)
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = font
+        cell.fill = fill
+        cell.alignment = alignment
+        cells.append(cell)
+    for letter, width in (widths or {}).items():
+        ws.column_dimensions[letter].width = width
+    ws.append(cells)
+
+def _shown_systems(totals):
+    return [s for s in REGISTRY.systems
+            if s.name in BASE_SYSTEMS or totals.get(s.name, {}).get("rooms")]
+
+def _summary_rows(totals):
+    systems = _shown_systems(totals)
+    rows = [["Total Net Area (sf)", round(totals["net"], 2)]]
+    for system in systems:
+        sums = totals[system.name]
+        for field in system.fields:
+            rows.append([f"{system.label} – {FIELD_LABELS[field]}",
+                         round(sums[TOTAL_KEYS[field]], FIELD_DECIMALS[field])])
+    for system in systems:
+        rows.append([f"# {system.label} Rooms", totals[system.name]["rooms"]])
+    return rows
+
+def _system_rows(totals):
+    rows = []
+    for system in _shown_systems(totals):
+        sums = totals[system.name]
+        rows.append([system.name, "rooms", sums["rooms"], round(sums["area"],2)] + [
+            round(sums[TOTAL_KEYS[f]], FIELD_DECIMALS[f]) if f in system.fields else None
+            for f in QUANTITY_FIELDS
+        ])
+    return rows
+
+def _room_row(r):
+    room = r['room']
+    m = r['materials']
+    return [
+        room['id'], room['name'], room['length'], room['width'], room['height'],
+        room['doors'], room['windows'], m['type'],
+        r['gross_area'], r['net_area'],
+        m.get('primer_gallons'), m.get('finish_gallons'), m.get('total_gallons'), m.get('rolls'),
     ]
-    for i, (k, v) in enumerate(data, start=2):
-        ws.cell(row=i, column=1, value=k)
-        ws.cell(row=i, column=2, value=v)
+
+def _room_rows(results):
+    # TakeoffResults builds the rows straight from its columns.
+    if hasattr(results, "breakdown_rows"):
+        return results.breakdown_rows()
+    return map(_room_row, results)
+
+def _breakdown_headers(results):
+    return TYPICAL_BREAKDOWN_HEADERS if isinstance(results, TypicalResults) else ROOM_BREAKDOWN_HEADERS
+
+def _rollup_for(results, rollup=None):
+    if rollup is None:
+        rollup = results.rollup() if isinstance(results, TakeoffResults) else Rollup.from_results(results)
+    return rollup
+
+def _totals_for(results, totals, rollup=None):
+    if totals is None:
+        totals = _rollup_for(results, rollup).totals()
+    return totals
+
+def _rollup_rows(rollup):
+    for row in rollup.tree():
+        yield [row["level"].replace("_", " ").title(), row["project"], row.get("floor"), row.get("room_type"),
+               row.get("system"), row["rooms"], row["gross_area"], row["net_area"],
+               *(row[f] for f in QUANTITY_FIELDS)]
+
+def create_summary_sheet(wb, results, totals=None, rollup=None):
+    ws = wb.create_sheet("Summary", 0)
+    _header(ws, SUMMARY_HEADERS)
+    totals = _totals_for(results, totals, rollup)
+    for row in _summary_rows(totals):
+        ws.append(row)
 
 def create_room_breakdown_sheet(wb, results):
     ws = wb.create_sheet("Room Breakdown")
-    _header(ws, [
-        "Room ID","Name","L (ft)","W (ft)","H (ft)",
-        "Doors","# Windows","Finish Type",
-        "Gross Area (sf)","Net Area (sf)",
-        "Primer (gal)","Finish (gal)","Total (gal)","Rolls"
-    ])
-    row = 2
-    for r in results:
-        room = r['room']
-        m = r['materials']
-        ws.cell(row=row, column=1, value=room['id'])
-        ws.cell(row=row, column=2, value=room['name'])
-        ws.cell(row=row, column=3, value=room['length'])
-        ws.cell(row=row, column=4, value=room['width'])
-        ws.cell(row=row, column=5, value=room['height'])
-        ws.cell(row=row, column=6, value=room['doors'])
-        ws.cell(row=row, column=7, value=room['windows'])
-        ws.cell(row=row, column=8, value=m['type'])
-        ws.cell(row=row, column=9, value=r['gross_area'])
-        ws.cell(row=row, column=10, value=r['net_area'])
-        ws.cell(row=row, column=11, value=m.get('primer_gallons'))
-        ws.cell(row=row, column=12, value=m.get('finish_gallons'))
-        ws.cell(row=row, column=13, value=m.get('total_gallons'))
-        ws.cell(row=row, column=14, value=m.get('rolls'))
-        row += 1
-
-def create_system_breakdown_sheet(wb, results):
+    _header(ws, _breakdown_headers(results))
+    if isinstance(results, TypicalResults):
+        ws.column_dimensions["A"].width = FLOOR_GROUP_WIDTH
+    for row in _room_rows(results):
+        ws.append(row)
+
+def create_system_breakdown_sheet(wb, results, totals=None, rollup=None):
     ws = wb.create_sheet("System Breakdown")
-    _header(ws, ["System","Rooms","#","Net Area (sf)","Primer (gal)","Finish (gal)","Total (gal)","Rolls"])
-
-    agg = {
-        "paint": {"rooms": 0, "area": 0.0, "primer": 0.0, "finish": 0.0, "total": 0.0},
-        "wallcovering": {"rooms": 0, "area": 0.0, "rolls": 0.0},
-    }
-    for r in results:
-        m = r['materials']
-        if m['type'] == 'paint':
-            agg["paint"]["rooms"] += 1
-            agg["paint"]["area"] += r['net_area']
-            agg["paint"]["primer"] += m.get('primer_gallons', 0.0)
-            agg["paint"]["finish"] += m.get('finish_gallons', 0.0)
-            agg["paint"]["total"] += m.get('total_gallons', 0.0)
-        else:
-            agg["wallcovering"]["rooms"] += 1
-            agg["wallcovering"]["area"] += r['net_area']
-            agg["wallcovering"]["rolls"] += m.get('rolls', 0.0)
-
-    ws.append(["paint", "rooms", agg["paint"]["rooms"], round(agg["paint"]["area"],2),
-               round(agg["paint"]["primer"],2), round(agg["paint"]["finish"],2),
-               round(agg["paint"]["total"],2), None])
-    ws.append(["wallcovering", "rooms", agg["wallcovering"]["rooms"], round(agg["wallcovering"]["area"],2),
-               None, None, None, round(agg["wallcovering"]["rolls"],1)])
-
-def generate_workbook(results, output_path):
+    _header(ws, SYSTEM_BREAKDOWN_HEADERS)
+    totals = _totals_for(results, totals, rollup)
+    for row in _system_rows(totals):
+        ws.append(row)
+
+def create_rollup_sheet(wb, results, rollup=None):
+    """Project -> floor -> room type -> system outline (see src.rollups)."""
+    ws = wb.create_sheet("Rollup")
+    _header(ws, ROLLUP_HEADERS)
+    for row in _rollup_rows(_rollup_for(results, rollup)):
+        ws.append(row)
+
+def _alternate_row(a):
+    return [a['scenario'], a['changes'], a['primer_gallons'], a['finish_gallons'], a['total_gallons'],
+            a['rolls'], a['cost'], a['delta_total_gallons'], a['delta_rolls'], a['delta_cost']]
+
+def create_alternates_sheet(wb, alternates):
+    """What-if scenarios (`scenarios.evaluate_scenarios` rows), base first."""
+    ws = wb.create_sheet("Alternates")
+    _header(ws, ALTERNATES_HEADERS)
+    ws.column_dimensions["B"].width = 60
+    for a in alternates:
+        ws.append(_alternate_row(a))
+
+def _project_row(p):
+    return [p.get('project'), p.get('floor'), p.get('input'), p.get('rooms'),
+            p.get('net_area'), p.get('total_gallons'), p.get('rolls')]
+
+def create_projects_sheet(wb, projects):
+    """Per-project rollup for consolidated (multi-plan-set) workbooks."""
+    ws = wb.create_sheet("Projects", 1)
+    _header(ws, PROJECT_HEADERS)
+    for p in projects:
+        ws.append(_project_row(p))
+
+def write_streaming_workbook(results, output_path, projects=None, totals=None, rollup=None, alternates=None):
+    """Single pass over `results` (any iterable) with openpyxl's write-only mode.
+
+    Room rows are streamed to the Room Breakdown sheet as they arrive and
+    rolled up ROLLUP_CHUNK rooms at a time, then the Summary, System
+    Breakdown and Rollup sheets are filled in. Memory stays flat regardless
+    of the number of rooms.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    summary = wb.create_sheet("Summary")
+    if projects is not None:
+        projects_ws = wb.create_sheet("Projects")
+        _stream_header(projects_ws, PROJECT_HEADERS)
+        for p in projects:
+            projects_ws.append(_project_row(p))
+    rooms_ws = wb.create_sheet("Room Breakdown")
+    systems = wb.create_sheet("System Breakdown")
+    rollup_ws = wb.create_sheet("Rollup")
+    if alternates is not None:
+        alternates_ws = wb.create_sheet("Alternates")
+        _stream_header(alternates_ws, ALTERNATES_HEADERS, {"B": 60})
+        for a in alternates:
+            alternates_ws.append(_alternate_row(a))
+    _stream_header(summary, SUMMARY_HEADERS)
+    _stream_header(rooms_ws, _breakdown_headers(results),
+                   {"A": FLOOR_GROUP_WIDTH} if isinstance(results, TypicalResults) else None)
+    _stream_header(systems, SYSTEM_BREAKDOWN_HEADERS)
+    _stream_header(rollup_ws, ROLLUP_HEADERS)
+
+    if rollup is None and not isinstance(results, Sequence):
+        parts = []
+        iterator = iter(results)
+        while True:
+            chunk = TakeoffResults.from_results(islice(iterator, ROLLUP_CHUNK))
+            if not len(chunk):
+                break
+            for row in chunk.breakdown_rows():
+                rooms_ws.append(row)
+            parts.append(chunk.rollup())
+        rollup = Rollup.concat(parts)
+    else:
+        for row in _room_rows(results):
+            rooms_ws.append(row)
+        rollup = _rollup_for(results, rollup)
+    totals = _totals_for(results, totals, rollup)
+    for row in _summary_rows(totals):
+        summary.append(row)
+    for row in _system_rows(totals):
+        systems.append(row)
+    for row in _rollup_rows(rollup):
+        rollup_ws.append(row)
+    wb.save(output_path)
+    return output_path
+
+def generate_workbook(results, output_path, streaming=None, projects=None, totals=None, rollup=None,
+                      alternates=None, typical=False):
+    """Write the bid package and return `output_path`.
+
+    `output_path` may be a filesystem path or a writable binary buffer
+    (e.g. `io.BytesIO`); nothing touches disk in the buffer case.
+    `streaming=None` picks the write-only writer for iterators and for
+    projects above STREAMING_THRESHOLD rooms; pass True/False to force it.
+    `projects` (consolidated batch runs) adds a per-project "Projects" sheet.
+    `totals` (e.g. `TakeoffSession.totals()`) skips re-summing the results.
+    `rollup` (a `rollups.Rollup`, e.g. `results.rollup(project, floor)`) feeds
+    the Summary, System Breakdown and Rollup sheets; by default the results
+    are rolled up once (and cached on a `TakeoffResults`).
+    `alternates` (`scenarios.evaluate_scenarios` rows) adds an "Alternates" sheet.
+    `typical=True` collapses repeated floors and identical rooms (`src.typical`):
+    Room Breakdown lists each once with its floor group and multiplier, and
+    the Rollup sheet shows "Floor 3–22 (typical) ×20" rows; totals are unchanged.
+    A `TypicalResults` passed as `results` is written the same way.
+    """
+    if typical and not isinstance(results, TypicalResults):
+        results = collapse(results)
+    if streaming is None:
+        streaming = not isinstance(results, Sequence) or len(results) > STREAMING_THRESHOLD
+    if streaming:
+        return write_streaming_workbook(results, output_path, projects, totals, rollup, alternates)
+
+    from openpyxl import Workbook
+
     wb = Workbook()
     # remove default sheet
     if "Sheet" in wb.sheetnames:
         wb.remove(wb["Sheet"])
-    create_summary_sheet(wb, results)
+    rollup = _rollup_for(results, rollup)
+    create_summary_sheet(wb, results, totals, rollup)
+    if projects is not None:
+        create_projects_sheet(wb, projects)
     create_room_breakdown_sheet(wb, results)
-    create_system_breakdown_sheet(wb, results)
+    create_system_breakdown_sheet(wb, results, totals, rollup)
+    create_rollup_sheet(wb, results, rollup)
+    if alternates is not None:
+        create_alternates_sheet(wb, alternates)
     wb.save(output_path)
     return output_path
+
+def workbook_bytes(results, **kwargs) -> bytes:
+    """Build the bid package entirely in memory and return the .xlsx bytes.
+
+    Takes the same keyword arguments as `generate_workbook`.
+    """
+    buffer = io.BytesIO()
+    generate_workbook(results, buffer, **kwargs)
+    return buffer.getvalue()
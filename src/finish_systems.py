@@ -1,23 +1,235 @@
-from src.config import FINISH_SYSTEMS
+"""Finish-system registry: material math for every finish system.
+
+Each system declares its products (coats, coverage, waste, pattern repeat)
+once, in `config.FINISH_SYSTEMS` or a JSON file. The registry compiles them
+into a coefficient table indexed by finish code, so the batch engine computes
+every room's quantities with one gather-and-multiply and finish types are
+resolved with a dict lookup.
+
+A quantity field is `net_area * (M + R / height) / D`, where M holds the
+coats and waste factors, R the pattern-repeat waste per drop and D the
+coverage. A field fed by a single product keeps its coverage in D so the
+arithmetic is exactly the legacy `area * coats / coverage`.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.config import FINISH_SYSTEMS, FINISH_SYSTEMS_FILE
+
+# Every quantity a finish system can produce, in output column order.
+QUANTITY_FIELDS = ("primer_gallons", "finish_gallons", "total_gallons", "rolls")
+PRODUCT_FIELDS = ("primer_gallons", "finish_gallons", "rolls")
+FIELD_DECIMALS = {"primer_gallons": 2, "finish_gallons": 2, "total_gallons": 2, "rolls": 1}
+# Running-total key (excel_exporter / TakeoffSession) and summary label per field
+TOTAL_KEYS = {"primer_gallons": "primer", "finish_gallons": "finish", "total_gallons": "total", "rolls": "rolls"}
+FIELD_LABELS = {"primer_gallons": "Primer Gallons", "finish_gallons": "Finish Gallons",
+                "total_gallons": "Total Gallons", "rolls": "Rolls"}
+DEFAULT_SYSTEM = "paint"
+
+
+class Product(NamedTuple):
+    field: str
+    name: str
+    coverage: float
+    coats: float = 1
+    waste: float = 0.0
+    pattern_repeat_in: float = 0.0
+
+
+class FinishSystem(NamedTuple):
+    name: str
+    label: str
+    products: Tuple[Product, ...]
+    total: Optional[str]
+    aliases: Tuple[str, ...]
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Quantity fields this system yields (its `materials` keys besides `type`)."""
+        used = {p.field for p in self.products} | ({self.total} if self.total else set())
+        return tuple(f for f in QUANTITY_FIELDS if f in used)
+
+    @property
+    def is_wallcovering(self) -> bool:
+        return any(p.field == "rolls" for p in self.products)
+
+
+def _parse_system(name: str, spec: Dict) -> FinishSystem:
+    try:
+        products = tuple(
+            Product(
+                field=p["field"],
+                name=p.get("name", p["field"]),
+                coverage=float(p["coverage"]),
+                coats=p.get("coats", 1),
+                waste=float(p.get("waste", 0.0)),
+                pattern_repeat_in=float(p.get("pattern_repeat_in", 0.0)),
+            )
+            for p in spec["products"]
+        )
+    except (KeyError, TypeError) as exc:
+        raise ValueError(f"Finish system {name!r}: malformed products ({exc})") from None
+    for p in products:
+        if p.field not in PRODUCT_FIELDS:
+            raise ValueError(f"Finish system {name!r}: unknown product field {p.field!r} (use {PRODUCT_FIELDS})")
+        if p.coverage <= 0 or p.coats < 0 or p.waste < 0 or p.pattern_repeat_in < 0:
+            raise ValueError(f"Finish system {name!r}: product {p.name!r} needs coverage > 0 and non-negative factors")
+    total = spec.get("total")
+    if total not in (None, "total_gallons"):
+        raise ValueError(f"Finish system {name!r}: 'total' can only be 'total_gallons'")
+    if not products:
+        raise ValueError(f"Finish system {name!r} has no products")
+    aliases = tuple(a.lower() for a in spec.get("aliases", ()))
+    return FinishSystem(name.lower(), spec.get("label", name.title()), products, total, aliases)
+
+
+def load_finish_systems(path) -> Dict[str, Dict]:
+    """Read extra finish-system specs from a JSON file (same shape as FINISH_SYSTEMS)."""
+    with open(path) as f:
+        specs = json.load(f)
+    if not isinstance(specs, dict):
+        raise ValueError(f"{path}: expected an object of finish systems")
+    return specs
+
+
+class FinishRegistry:
+    """Finish systems by code (position) plus their compiled coefficient table."""
+
+    def __init__(self, specs: Dict[str, Dict]):
+        self.systems: List[FinishSystem] = [_parse_system(name, spec) for name, spec in specs.items()]
+        self.names: Tuple[str, ...] = tuple(s.name for s in self.systems)
+        if DEFAULT_SYSTEM not in self.names:
+            raise ValueError(f"The {DEFAULT_SYSTEM!r} finish system is required")
+        self._codes = {name: i for i, name in enumerate(self.names)}
+        self._default = self._codes[DEFAULT_SYSTEM]
+        self._spec = {name: specs[name] for name in specs}
+        self._compile()
+
+    def _compile(self) -> None:
+        n, k = len(self.systems), len(PRODUCT_FIELDS)
+        self.mult = np.zeros((n, k))
+        self.repeat = np.zeros((n, k))
+        self.div = np.ones((n, k))
+        # Which of QUANTITY_FIELDS each system reports (the rest stay NaN).
+        self.applies = np.zeros((n, len(QUANTITY_FIELDS)), dtype=bool)
+        for i, system in enumerate(self.systems):
+            for j, field in enumerate(PRODUCT_FIELDS):
+                products = [p for p in system.products if p.field == field]
+                if len(products) == 1:
+                    p = products[0]
+                    self.mult[i, j] = p.coats * (1 + p.waste)
+                    self.repeat[i, j] = p.coats * p.pattern_repeat_in / 12
+                    self.div[i, j] = p.coverage
+                else:
+                    self.mult[i, j] = sum(p.coats * (1 + p.waste) / p.coverage for p in products)
+                    self.repeat[i, j] = sum(p.coats * p.pattern_repeat_in / 12 / p.coverage for p in products)
+            self.applies[i] = [f in system.fields for f in QUANTITY_FIELDS]
+        self.uses_height = bool(self.repeat.any())
+        # Plain-float rows for the scalar path (NumPy scalars are slow one at a time).
+        self._rows = list(zip(self.mult.tolist(), self.repeat.tolist(), self.div.tolist()))
+        self._matched: Dict[str, str] = {}
+        self._material_keys = {s.name: ("type",) + s.fields for s in self.systems}
+        self._aliases = sorted(
+            ((alias, s.name) for s in self.systems for alias in (s.name, s.label.lower()) + s.aliases),
+            key=lambda item: -len(item[0]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.systems)
+
+    def code(self, finish_type) -> int:
+        """Finish code for a system name; unknown names fall back to paint."""
+        return self._codes.get((finish_type or "").lower(), self._default)
+
+    def get(self, finish_type) -> FinishSystem:
+        return self.systems[self.code(finish_type)]
+
+    def fields(self, finish_type) -> Tuple[str, ...]:
+        return self.get(finish_type).fields
+
+    def material_keys(self, name: str) -> Tuple[str, ...]:
+        """Keys of a materials dict for system `name` (`type` first)."""
+        keys = self._material_keys.get(name)
+        return keys if keys is not None else ("type",) + self.fields(name)
+
+    def match(self, text: str) -> str:
+        """System named in free text (schedule cells); longest alias wins."""
+        text = (text or "").lower()
+        name = self._matched.get(text)
+        if name is None:
+            name = next((n for alias, n in self._aliases if re.search(rf"\b{re.escape(alias)}\b", text)),
+                        DEFAULT_SYSTEM)
+            if len(self._matched) < 4096:  # streamed room lists repeat a handful of values
+                self._matched[text] = name
+        return name
+
+    def spec(self) -> Dict[str, Dict]:
+        """The source specs (for cache fingerprints)."""
+        return self._spec
+
+    def materials(self, net_area: float, finish_type: str, height: Optional[float] = None) -> Dict:
+        """Scalar counterpart of `quantities` for one room."""
+        i = self.code(finish_type)
+        system = self.systems[i]
+        mult, repeat, div = self._rows[i]
+        area = max(0.0, float(net_area))
+        inv_h = 1 / float(height) if self.uses_height and height and float(height) > 0 else 0.0
+        raw = {
+            field: (area * (mult[j] + repeat[j] * inv_h)) / div[j]
+            for j, field in enumerate(PRODUCT_FIELDS)
+        }
+        raw['total_gallons'] = raw['primer_gallons'] + raw['finish_gallons']
+        out = {'type': system.name}
+        for field in system.fields:
+            out[field] = round(raw[field], FIELD_DECIMALS[field])
+        return out
+
+    def quantities(self, net: np.ndarray, codes: np.ndarray, height: np.ndarray) -> Dict[str, np.ndarray]:
+        """Unrounded QUANTITY_FIELDS columns for every room; NaN where a system has no such field."""
+        mult = self.mult[codes]
+        if self.uses_height:
+            inv_h = np.divide(1.0, height, out=np.zeros_like(net), where=height > 0)
+            mult = mult + self.repeat[codes] * inv_h[:, None]
+        q = (net[:, None] * mult) / self.div[codes]
+        primer, finish, rolls = q[:, 0], q[:, 1], q[:, 2]
+        applies = self.applies[codes]
+        return {
+            field: np.where(applies[:, j], values, np.nan)
+            for j, (field, values) in enumerate(zip(QUANTITY_FIELDS, (primer, finish, primer + finish, rolls)))
+        }
+
+
+def _registry_specs() -> Dict[str, Dict]:
+    specs = dict(FINISH_SYSTEMS)
+    path = os.environ.get("PAINTPILOT_FINISH_SYSTEMS")
+    if path is None:
+        default = Path(__file__).resolve().parents[1] / FINISH_SYSTEMS_FILE
+        path = str(default) if default.exists() else ""
+    if path:
+        specs.update(load_finish_systems(path))
+    return specs
+
+
+REGISTRY = FinishRegistry(_registry_specs())
+
+
+def calculate_materials(net_area: float, finish_type: str, height: Optional[float] = None) -> Dict:
+    """Materials dict (`type` plus the system's quantity fields) for one room."""
+    return REGISTRY.materials(net_area, finish_type, height)
+
 
 def calculate_paint_materials(area_sqft: float):
     """Calculate primer + paint gallons for given area."""
-    area = max(0.0, float(area_sqft))
-    primer_cov = FINISH_SYSTEMS['paint']['primer']['coverage']
-    finish_cov = FINISH_SYSTEMS['paint']['finish']['coverage']
-    finish_coats = FINISH_SYSTEMS['paint']['finish']['coats']
-
-    primer_gallons = area / primer_cov
-    finish_gallons = (area * finish_coats) / finish_cov
+    m = REGISTRY.materials(area_sqft, 'paint')
+    return {k: m[k] for k in ('primer_gallons', 'finish_gallons', 'total_gallons')}
 
-    return {
-        'primer_gallons': round(primer_gallons, 2),
-        'finish_gallons': round(finish_gallons, 2),
-        'total_gallons': round(primer_gallons + finish_gallons, 2),
-    }
 
 def calculate_wallcovering_materials(area_sqft: float):
     """Calculate wallcovering rolls needed."""
-    area = max(0.0, float(area_sqft))
-    rolls = area / FINISH_SYSTEMS['wallcovering']['coverage']
-    return {'rolls': round(rolls, 1)}
+    return {'rolls': REGISTRY.materials(area_sqft, 'wallcovering')['rolls']}
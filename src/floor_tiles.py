@@ -0,0 +1,225 @@
+"""Raster floor-plan previews: a PNG thumbnail plus a zoomable tile pyramid.
+
+Rooms are placed with the same `_flow_layout` as the SVG renderers and drawn
+with Pillow, so the browser only ever receives a few fixed-size images no
+matter how many rooms a floor has. Zoom level 0 fits the whole plan into
+one tile; each level doubles the scale, up to the first level where rooms
+are drawn at DETAIL_PX_PER_FT. Tiles are rendered on demand (only the rooms
+that overlap the tile are drawn) and cached on disk per project hash.
+
+    pyramid = TilePyramid(rooms_data)
+    pyramid.thumbnail()            # PNG bytes, whole plan
+    pyramid.grid(z)                # (columns, rows) at zoom z
+    pyramid.tile(z, col, row)      # PNG bytes
+    pyramid.tile_row(z, row)       # one row of tiles stitched together
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.floor_visualizer import (
+    GAP_PX, LOD_LABEL_MIN_HPX, LOD_LABEL_MIN_WPX, LOD_MARKER_MIN_WPX, LOD_SUB_MIN_HPX, ROOM_FILL_PAINT,
+    ROOM_FILL_WC, ROOM_STROKE, TEXT_COLOR, _condense_label, _flow_layout, _is_wallcovering, _net_areas,
+    _unit_outline,
+)
+
+TILE_PX = 512
+THUMB_PX = 1024              # longest side of the thumbnail
+DETAIL_PX_PER_FT = 8.0       # deepest zoom: a 12 ft room is ~100 px
+MARGIN_PX = 8
+BACKGROUND = "#ffffff"
+DEFAULT_TILE_DIR = ".paintpilot_tiles"
+MAX_CACHED_PROJECTS = 32
+RENDERER_VERSION = 2         # bump when the drawing changes, to invalidate cached tiles
+
+# Room fields the picture depends on (layout, colour, labels, markers)
+_DRAWN_FIELDS = ("id", "name", "length", "width", "height", "doors", "windows", "finish_type",
+                 "outline", "wall_heights", "openings")
+
+
+def project_hash(rooms_data: Dict) -> str:
+    """Hash of everything the raster preview shows (cache key for its tiles)."""
+    rows = [[r.get(k) for k in _DRAWN_FIELDS] for r in rooms_data.get("rooms", [])]
+    payload = json.dumps([RENDERER_VERSION, TILE_PX, DETAIL_PX_PER_FT, rows], default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+@lru_cache(maxsize=8)
+def _font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+class TilePyramid:
+    """Thumbnail and tiles for one floor plan (rooms sorted like the SVG preview)."""
+
+    def __init__(self, rooms_data: Dict, cache_dir: Optional[str] = DEFAULT_TILE_DIR):
+        rooms = sorted(rooms_data.get("rooms", []), key=lambda r: (str(r.get("id", "")), str(r.get("name", ""))))
+        placed, self.width_ft, self.height_ft = _flow_layout(rooms)
+        self.rooms: List[Dict] = [p.room for p in placed]
+        self.n_rooms = len(placed)
+        # Placements as arrays so a tile can find its rooms with one mask.
+        self.x = np.array([p.x for p in placed], dtype=np.float64)
+        self.y = np.array([p.y for p in placed], dtype=np.float64)
+        self.w = np.array([p.w for p in placed], dtype=np.float64)
+        self.h = np.array([p.h for p in placed], dtype=np.float64)
+        self.wallcovering = np.array([_is_wallcovering(r.get("finish_type")) for r in self.rooms], dtype=bool)
+        self.areas = _net_areas(self.rooms)
+        self.outlines = [_unit_outline(r) for r in self.rooms]
+        self._min_h = float(self.h.min()) if self.n_rooms else 0.0
+
+        extent = max(self.width_ft, self.height_ft, 1.0)
+        self.base_scale = (TILE_PX - 2 * MARGIN_PX) / extent  # px per ft at zoom 0
+        self.max_zoom = 0
+        while self.base_scale * 2 ** self.max_zoom < DETAIL_PX_PER_FT:
+            self.max_zoom += 1
+
+        self.key = project_hash(rooms_data)
+        self.cache_dir = Path(cache_dir) / self.key if cache_dir else None
+
+    # --- geometry ---
+
+    def scale(self, z: int) -> float:
+        return self.base_scale * 2 ** z
+
+    def size(self, z: int) -> Tuple[int, int]:
+        """Full plan size in px at zoom z."""
+        s = self.scale(z)
+        return int(np.ceil(self.width_ft * s)) + 2 * MARGIN_PX, int(np.ceil(self.height_ft * s)) + 2 * MARGIN_PX
+
+    def grid(self, z: int) -> Tuple[int, int]:
+        """(columns, rows) of tiles at zoom z."""
+        w, h = self.size(z)
+        return max(1, -(-w // TILE_PX)), max(1, -(-h // TILE_PX))
+
+    # --- rendering ---
+
+    def _render(self, scale: float, x0: float, y0: float, width: int, height: int):
+        """Draw the rooms overlapping the px window (x0, y0, width, height) at `scale`."""
+        from PIL import Image, ImageDraw
+
+        image = Image.new("RGB", (width, height), BACKGROUND)
+        if not self.n_rooms:
+            return image
+        draw = ImageDraw.Draw(image)
+        gap = min(GAP_PX, 0.15 * self._min_h * scale)
+        left = MARGIN_PX + self.x * scale + gap / 2 - x0
+        top = MARGIN_PX + self.y * scale + gap / 2 - y0
+        w = self.w * scale - gap
+        h = self.h * scale - gap
+        visible = np.flatnonzero((left < width) & (top < height) & (left + w > 0) & (top + h > 0) & (w > 0) & (h > 0))
+
+        main_font, sub_font = _font(14), _font(12)
+        for i in visible.tolist():
+            x, y, rw, rh = float(left[i]), float(top[i]), float(w[i]), float(h[i])
+            fill = ROOM_FILL_WC if self.wallcovering[i] else ROOM_FILL_PAINT
+            stroke = ROOM_STROKE if rw >= 3 and rh >= 3 else None
+            unit = self.outlines[i]
+            if unit:
+                draw.polygon([(x + u * rw, y + v * rh) for u, v in unit], fill=fill, outline=stroke)
+            else:
+                draw.rectangle((x, y, x + rw, y + rh), fill=fill, outline=stroke)
+            room = self.rooms[i]
+            if rw >= LOD_LABEL_MIN_WPX and rh >= LOD_LABEL_MIN_HPX:
+                label_main = f'{room["id"]} · {self.areas[i]} sf'  # default font has no "•"
+                label_sub = str(room["name"])
+                if rw < 130:
+                    label_main = _condense_label(label_main, 10)
+                    label_sub = _condense_label(label_sub, 10)
+                cx, cy = x + rw / 2, y + rh / 2
+                if rh >= LOD_SUB_MIN_HPX:
+                    draw.text((cx, cy - 4), label_main, fill=TEXT_COLOR, font=main_font, anchor="ms")
+                    draw.text((cx, cy + 12), label_sub, fill=TEXT_COLOR, font=sub_font, anchor="ms")
+                else:
+                    draw.text((cx, cy + 5), label_main, fill=TEXT_COLOR, font=main_font, anchor="ms")
+            if rw >= LOD_MARKER_MIN_WPX:
+                dx = x + 6
+                for color, count in (("#222222", room.get("doors", 0)), ("#4488aa", room.get("windows", 0))):
+                    for _ in range(min(6, int(count))):
+                        draw.rectangle((dx, y + 2, dx + 6, y + 4), fill=color)
+                        dx += 10
+        return image
+
+    @staticmethod
+    def _png(image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=False)
+        return buffer.getvalue()
+
+    def _cached(self, name: str, render) -> bytes:
+        path = self.cache_dir / name if self.cache_dir else None
+        if path and path.exists():
+            return path.read_bytes()
+        data = self._png(render())
+        if path:
+            # Sessions share the cache: only the one that creates a tile set evicts,
+            # and each writer renames its own temp file into place.
+            try:
+                self.cache_dir.mkdir(parents=True)
+            except FileExistsError:
+                pass
+            else:
+                _evict(self.cache_dir.parent)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        return data
+
+    def thumbnail(self, max_px: int = THUMB_PX) -> bytes:
+        """Whole plan as one PNG, longest side `max_px`."""
+        extent = max(self.width_ft, self.height_ft, 1.0)
+        scale = (max_px - 2 * MARGIN_PX) / extent
+        width = int(np.ceil(self.width_ft * scale)) + 2 * MARGIN_PX
+        height = int(np.ceil(self.height_ft * scale)) + 2 * MARGIN_PX
+        return self._cached(f"thumb_{max_px}.png", lambda: self._render(scale, 0, 0, width, height))
+
+    def tile(self, z: int, col: int, row: int) -> bytes:
+        """One TILE_PX square PNG at zoom z (edge tiles are cropped to the plan)."""
+        if not 0 <= z <= self.max_zoom:
+            raise ValueError(f"zoom must be 0..{self.max_zoom}, got {z}")
+        cols, rows = self.grid(z)
+        if not (0 <= col < cols and 0 <= row < rows):
+            raise ValueError(f"tile ({col}, {row}) is outside the {cols}x{rows} grid at zoom {z}")
+        full_w, full_h = self.size(z)
+        x0, y0 = col * TILE_PX, row * TILE_PX
+        width, height = min(TILE_PX, full_w - x0), min(TILE_PX, full_h - y0)
+        return self._cached(f"{z}/{col}_{row}.png", lambda: self._render(self.scale(z), x0, y0, width, height))
+
+    def tile_row(self, z: int, row: int) -> bytes:
+        """A full-width strip: every tile of `row` at zoom z, side by side."""
+        from PIL import Image
+
+        cols, _ = self.grid(z)
+        tiles = [Image.open(io.BytesIO(self.tile(z, col, row))) for col in range(cols)]
+        strip = Image.new("RGB", (sum(t.width for t in tiles), tiles[0].height), BACKGROUND)
+        x = 0
+        for t in tiles:
+            strip.paste(t, (x, 0))
+            x += t.width
+        return self._png(strip)
+
+
+def _evict(root: Path) -> None:
+    """Keep the MAX_CACHED_PROJECTS most recently created tile sets."""
+    projects = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime)
+    for path in projects[:max(0, len(projects) - MAX_CACHED_PROJECTS)]:
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,4 +1,12 @@
-from typing import Dict, List, Tuple
+import io
+from html import escape
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.batch_engine import rooms_to_columns
+from src.finish_systems import REGISTRY
+from src.geometry import outline_extent, room_outline, wall_areas
 
 # === Visual design ===
 ROOM_FILL_PAINT = "#cfe8ff"      # pastel blue
@@ -25,22 +33,65 @@ ROOM_MIN_HPX = 110
 LABEL_MAIN_SIZE = 14
 LABEL_SUB_SIZE  = 12
 
+# Compact mode: fit the whole floor (no min room size) and drop detail on
+# rooms too small to show it. Used automatically above COMPACT_THRESHOLD rooms.
+COMPACT_THRESHOLD   = 200
+LOD_LABEL_MIN_WPX   = 40             # below this: no labels (tooltip only)
+LOD_LABEL_MIN_HPX   = 18
+LOD_SUB_MIN_HPX     = 34             # below this: main label only
+LOD_MARKER_MIN_WPX  = 60             # below this: no door/window markers
+FONT_STACK = "Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif"
+
+def _is_wallcovering(finish_type: str) -> bool:
+    # Roll-based systems (any wallcovering) share the green; coatings are blue.
+    return REGISTRY.get(finish_type).is_wallcovering
+
 def _room_color(finish_type: str) -> str:
-    return ROOM_FILL_WC if (finish_type or "").lower() == "wallcovering" else ROOM_FILL_PAINT
+    return ROOM_FILL_WC if _is_wallcovering(finish_type) else ROOM_FILL_PAINT
 
 def _condense_label(text: str, max_chars: int) -> str:
     return text if len(text) <= max_chars else text[:max_chars-1] + "…"
 
-def _computed_area(room: Dict) -> int:
-    L = float(room["length"]); W = float(room["width"]); H = float(room["height"])
-    doors = int(room.get("doors", 0)); windows = int(room.get("windows", 0))
-    area = 2*(L+W)*H - (doors*21 + windows*12)
-    return max(0, int(round(area)))
-
-def _flow_layout(rooms: List[Dict]) -> Tuple[List[Dict], float, float]:
+def _net_areas(rooms: List[Dict]) -> List[int]:
+    """Net wall area label (whole sq ft) of every room, from the shared geometry layer."""
+    if not rooms:
+        return []
+    _, net = wall_areas(rooms_to_columns(rooms))
+    return np.rint(net).astype(np.int64).tolist()
+
+def _footprint(room: Dict) -> Tuple[float, float]:
+    """Layout slot in ft: the outline's bounding box, else length x width."""
+    outline = room_outline(room)
+    if outline:
+        return outline_extent(outline)
+    return float(room["length"]), float(room["width"])
+
+def _unit_outline(room: Dict) -> Optional[List[Tuple[float, float]]]:
+    """Outline corners scaled into the unit square, y pointing down (plan north up)."""
+    outline = room_outline(room)
+    if not outline:
+        return None
+    xs = [x for x, _ in outline]
+    ys = [y for _, y in outline]
+    x0, y1 = min(xs), max(ys)
+    w, h = (max(xs) - x0) or 1.0, (y1 - min(ys)) or 1.0
+    return [((x - x0) / w, (y1 - y) / h) for x, y in outline]
+
+def _polygon_points(unit, x, y, w, h) -> str:
+    return " ".join(f"{x + u*w:.1f},{y + v*h:.1f}" for u, v in unit)
+
+class Placed(NamedTuple):
+    """A room's slot in the flow layout, in feet (the room itself is not copied)."""
+    room: Dict
+    x: float
+    y: float
+    w: float
+    h: float
+
+def _flow_layout(rooms: List[Dict]) -> Tuple[List[Placed], float, float]:
     """
     Place rooms into rows in "feet" units (width=length, height=width).
-    Return placed rooms (with _x,_y,_rw,_rh) and total extents (ft).
+    Return placements and total extents (ft).
     """
     placed = []
     x_ft = 0.0
@@ -49,8 +100,7 @@ def _flow_layout(rooms: List[Dict]) -> Tuple[List[Dict], float, float]:
     max_w_ft = 0.0
 
     for r in rooms:
-        rw = float(r["length"])
-        rh = float(r["width"])
+        rw, rh = _footprint(r)
         # wrap row if needed
         if x_ft > 0 and (x_ft + rw) > ROW_WRAP_FT:
             max_w_ft = max(max_w_ft, x_ft)
@@ -58,7 +108,7 @@ def _flow_layout(rooms: List[Dict]) -> Tuple[List[Dict], float, float]:
             y_ft += row_h_ft  # next row directly below (pixel gaps handled at draw time)
             row_h_ft = 0.0
 
-        placed.append({**r, "_x": x_ft, "_y": y_ft, "_rw": rw, "_rh": rh})
+        placed.append(Placed(r, x_ft, y_ft, rw, rh))
         x_ft += rw
         row_h_ft = max(row_h_ft, rh)
 
@@ -84,6 +134,9 @@ def _svg_text(cx, cy, text, size=12, weight="500", anchor="middle"):
             f'fill="{TEXT_COLOR}" text-anchor="{anchor}" '
             f'font-family="Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif">{text}</text>')
 
+def _svg_polygon(points, fill, stroke, stroke_w=1):
+    return f'<polygon points="{points}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_w}"/>'
+
 def _svg_title(text: str) -> str:
     return f'<title>{text}</title>'
 
@@ -103,11 +156,18 @@ def _legend() -> str:
         yy += 22
     return "\n".join(parts)
 
-def generate_floor_plan_svg(rooms_data: Dict) -> str:
+def generate_floor_plan_svg(rooms_data: Dict, compact: Optional[bool] = None, typical: bool = False) -> str:
     """
     Generate an SVG floor plan from rooms_data['rooms'].
     Each room should include: id, name, length, width, height, doors, windows, finish_type.
+    `compact=None` switches to the compact renderer above COMPACT_THRESHOLD rooms.
+    `typical=True` draws repeated floors once (src.typical); the title lists
+    the floor groups, e.g. "Floor 3–22 (typical) ×20".
     """
+    if typical:
+        from src.typical import typical_rooms_data
+
+        rooms_data = typical_rooms_data(rooms_data)
     rooms = list(rooms_data.get("rooms", []))
     if not rooms:
         return '<div style="color:#a00;">No rooms available for visualization.</div>'
@@ -116,6 +176,10 @@ def generate_floor_plan_svg(rooms_data: Dict) -> str:
     rooms.sort(key=lambda r: (str(r.get("id","")), str(r.get("name",""))))
 
     placed, w_ft, h_ft = _flow_layout(rooms)
+    if compact is None:
+        compact = len(rooms) > COMPACT_THRESHOLD
+    if compact:
+        return _compact_svg(rooms_data, placed, w_ft, h_ft)
     scale = _compute_scale(w_ft, h_ft)
 
     # Drawing origin for the layout area (top-left inside border/title)
@@ -137,11 +201,12 @@ def generate_floor_plan_svg(rooms_data: Dict) -> str:
     svg.append(_svg_text(origin_x + 4, MARGIN + 14, title or "Floor Plan Preview", 16, "700", "start"))
 
     # Rooms
-    for r in placed:
-        x = origin_x + r["_x"] * scale
-        y = origin_y + r["_y"] * scale
-        w = max(ROOM_MIN_WPX, r["_rw"] * scale)
-        h = max(ROOM_MIN_HPX, r["_rh"] * scale)
+    for p, area in zip(placed, _net_areas([p.room for p in placed])):
+        r = p.room
+        x = origin_x + p.x * scale
+        y = origin_y + p.y * scale
+        w = max(ROOM_MIN_WPX, p.w * scale)
+        h = max(ROOM_MIN_HPX, p.h * scale)
 
         # Apply pixel gap
         x += GAP_PX/2
@@ -150,7 +215,6 @@ def generate_floor_plan_svg(rooms_data: Dict) -> str:
         h -= GAP_PX
 
         fill  = _room_color(r.get("finish_type"))
-        area  = _computed_area(r)
         label_main = f'{r["id"]} • {area} sf'
         label_sub  = r["name"]
 
@@ -164,7 +228,11 @@ def generate_floor_plan_svg(rooms_data: Dict) -> str:
                               f'{r["length"]}x{r["width"]}x{r["height"]} ft | '
                               f'Doors:{r.get("doors",0)} Windows:{r.get("windows",0)}'))
 
-        svg.append(_svg_rect(x, y, w, h, fill, ROOM_STROKE, 1))
+        unit = _unit_outline(r)
+        if unit:
+            svg.append(_svg_polygon(_polygon_points(unit, x, y, w, h), fill, ROOM_STROKE, 1))
+        else:
+            svg.append(_svg_rect(x, y, w, h, fill, ROOM_STROKE, 1))
 
         # Labels (centered)
         svg.append(_svg_text(x + w/2, y + h/2 - 4, label_main, LABEL_MAIN_SIZE, "600"))
@@ -187,3 +255,107 @@ def generate_floor_plan_svg(rooms_data: Dict) -> str:
 
     svg.append('</svg>')
     return "\n".join(svg)
+
+# === Compact renderer ===
+# Shared CSS classes replace per-element presentation attributes, door/window
+# markers are <use> references to one <symbol>, and markup is streamed into a
+# single buffer instead of a list of strings.
+
+# Inline <style> in HTML is document-global, so every selector is scoped to
+# the plan's root class and symbol ids are prefixed.
+_COMPACT_STYLE = (
+    f'<style>'
+    f'.ppfp text{{font-family:{FONT_STACK};fill:{TEXT_COLOR}}}'
+    f'.ppfp .m{{font-size:{LABEL_MAIN_SIZE}px;font-weight:600;text-anchor:middle}}'
+    f'.ppfp .s{{font-size:{LABEL_SUB_SIZE}px;font-weight:400;text-anchor:middle}}'
+    f'.ppfp .h{{font-weight:600}}'
+    f'.ppfp .r{{stroke:{ROOM_STROKE};stroke-width:1;rx:3px}}'
+    f'.ppfp .p{{fill:{ROOM_FILL_PAINT}}}.ppfp .c{{fill:{ROOM_FILL_WC}}}'
+    f'</style>'
+)
+_COMPACT_DEFS = (
+    '<defs>' + _COMPACT_STYLE +
+    '<symbol id="ppfp-d"><rect width="6" height="2" rx="1" fill="#222"/></symbol>'
+    '<symbol id="ppfp-w"><rect width="6" height="2" rx="1" fill="#48a"/></symbol>'
+    '</defs>'
+)
+
+def _fit_scale(width_ft: float, height_ft: float) -> float:
+    draw_w_px = SVG_W - 2*MARGIN - LEGEND_PANEL_PX
+    draw_h_px = SVG_H - 2*MARGIN - TITLE_BAND_PX
+    if width_ft <= 0 or height_ft <= 0:
+        return SCALE_MIN
+    return min(draw_w_px / width_ft, draw_h_px / height_ft)
+
+def _compact_svg(rooms_data: Dict, placed: List[Placed], w_ft: float, h_ft: float) -> str:
+    scale = _fit_scale(w_ft, h_ft)
+    # Gaps shrink with the rooms so dense floors don't collapse to nothing.
+    gap = min(GAP_PX, 0.15 * min((p.h for p in placed), default=0) * scale)
+    origin_x = MARGIN
+    origin_y = MARGIN + TITLE_BAND_PX
+
+    out = io.StringIO()
+    write = out.write
+    write(f'<svg width="{SVG_W}" height="{SVG_H}" viewBox="0 0 {SVG_W} {SVG_H}" '
+          f'style="width:{SVG_W}px; height:auto; max-width:100%;" '
+          f'preserveAspectRatio="xMidYMid meet" '
+          f'xmlns="http://www.w3.org/2000/svg" role="img" aria-label="Floor plan preview" class="ppfp">')
+    write(_COMPACT_DEFS)
+    write(f'<rect x="{MARGIN/2:g}" y="{MARGIN/2:g}" width="{SVG_W - MARGIN}" height="{SVG_H - MARGIN}" '
+          f'rx="8" fill="#fff" stroke="{WALL_STROKE}" stroke-width="2"/>')
+    title = f'{rooms_data.get("project","Project")} - {rooms_data.get("floor","")}'.strip(" -")
+    write(f'<text class="h" x="{origin_x + 4}" y="{MARGIN + 14}" font-size="16">{escape(title or "Floor Plan Preview")}</text>')
+
+    for p, area in zip(placed, _net_areas([p.room for p in placed])):
+        r = p.room
+        x = origin_x + p.x * scale + gap/2
+        y = origin_y + p.y * scale + gap/2
+        w = p.w * scale - gap
+        h = p.h * scale - gap
+        if w <= 0 or h <= 0:
+            continue
+
+        fill_class = "c" if _is_wallcovering(r.get("finish_type")) else "p"
+        label_main = f'{r["id"]} • {area} sf'
+        doors, windows = int(r.get("doors", 0)), int(r.get("windows", 0))
+        write(f'<g><title>{escape(str(r["name"]))} | {escape(label_main)} | '
+              f'{r["length"]}x{r["width"]}x{r["height"]} ft | Doors:{doors} Windows:{windows}</title>')
+        unit = _unit_outline(r)
+        if unit:
+            write(f'<polygon class="r {fill_class}" points="{_polygon_points(unit, x, y, w, h)}"/>')
+        else:
+            write(f'<rect class="r {fill_class}" x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}"/>')
+
+        if w >= LOD_LABEL_MIN_WPX and h >= LOD_LABEL_MIN_HPX:
+            label_sub = str(r["name"])
+            if w < 130:
+                label_main = _condense_label(label_main, 10)
+                label_sub = _condense_label(label_sub, 10)
+            cx = x + w/2
+            if h >= LOD_SUB_MIN_HPX:
+                write(f'<text class="m" x="{cx:.1f}" y="{y + h/2 - 4:.1f}">{escape(label_main)}</text>')
+                write(f'<text class="s" x="{cx:.1f}" y="{y + h/2 + 12:.1f}">{escape(label_sub)}</text>')
+            else:
+                write(f'<text class="m" x="{cx:.1f}" y="{y + h/2 + 5:.1f}">{escape(label_main)}</text>')
+
+        if w >= LOD_MARKER_MIN_WPX:
+            dx = x + 6
+            my = y + 2
+            for _ in range(min(6, doors)):
+                write(f'<use href="#ppfp-d" x="{dx:.1f}" y="{my:.1f}"/>')
+                dx += 10
+            for _ in range(min(6, windows)):
+                write(f'<use href="#ppfp-w" x="{dx:.1f}" y="{my:.1f}"/>')
+                dx += 10
+        write('</g>')
+
+    x0 = SVG_W - LEGEND_PANEL_PX + 10
+    y0 = MARGIN + 10
+    write(f'<rect x="{x0-10}" y="{y0-10}" width="{LEGEND_PANEL_PX-20}" height="80" rx="6" fill="#fff" stroke="#ccc"/>')
+    write(f'<text class="h" x="{x0}" y="{y0}" font-size="13">Legend</text>')
+    for i, (label, fill_class) in enumerate((("Paint", "p"), ("Wallcovering", "c"))):
+        yy = y0 + 18 + 22*i
+        write(f'<rect class="r {fill_class}" x="{x0}" y="{yy}" width="22" height="14"/>')
+        write(f'<text x="{x0 + 32}" y="{yy + 11.5}" font-size="12">{label}</text>')
+    write('</svg>')
+    return out.getvalue()
@@ -0,0 +1,182 @@
+"""Wall geometry shared by the takeoff engine and the floor-plan previews.
+
+A room is a `length` x `width` rectangle unless it carries any of:
+
+    outline        [[x, y], ...] wall corners in ft, in order (the ring closes itself);
+                   L-shapes, angled walls... `length`/`width` then only size the preview slot
+    wall_heights   [h, ...] per wall (wall i runs from corner i to i+1); missing or
+                   null entries use the room `height`. Without an outline the
+                   walls are the rectangle's: length, width, length, width
+    openings       [{"type": "door", "width": 3, "height": 7, "count": 2}, {"area": 40}, ...]
+                   explicit openings; they replace the `doors`/`windows` deduction
+                   (STANDARD_OPENINGS sizes fill in a typed opening without a size)
+
+`pack_geometry` flattens those into a few extra room columns (corner
+coordinates with per-room offsets, one height per wall, one opening area per
+room), only when some room has them. `wall_areas` then computes every wall
+of every room with array operations: no per-room or per-wall Python loop,
+and rectangular rooms keep the exact `2 * (L + W) * H` arithmetic.
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import STANDARD_OPENINGS
+
+GEOMETRY_KEYS = ("outline", "wall_heights", "openings")
+
+
+def _fields(room):
+    """The mapping a room's geometry keys live in (`Room.extra` or the dict itself)."""
+    return room if isinstance(room, dict) else (getattr(room, "extra", None) or {})
+
+
+def _parsed(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def parse_outline(value) -> Optional[List[Tuple[float, float]]]:
+    """Corner list from a list of [x, y] pairs or its JSON text; None when absent."""
+    value = _parsed(value)
+    if value is None or (isinstance(value, (list, tuple)) and not value):
+        return None
+    try:
+        corners = [(float(x), float(y)) for x, y in value]
+    except (TypeError, ValueError):
+        raise ValueError(f"Room outline must be a list of [x, y] corners, got {value!r}") from None
+    if len(corners) > 1 and corners[0] == corners[-1]:
+        corners.pop()  # explicitly closed ring
+    if len(corners) < 3:
+        raise ValueError(f"Room outline needs at least 3 corners, got {len(corners)}")
+    return corners
+
+
+def outline_extent(corners: Sequence[Tuple[float, float]]) -> Tuple[float, float]:
+    """Bounding-box (x, y) size of an outline, in ft."""
+    xs = [x for x, _ in corners]
+    ys = [y for _, y in corners]
+    return max(xs) - min(xs), max(ys) - min(ys)
+
+
+def room_outline(room) -> Optional[List[Tuple[float, float]]]:
+    value = _fields(room).get("outline")
+    return None if value is None else parse_outline(value)
+
+
+def opening_area(opening) -> float:
+    """Area of one `openings` entry (a number is an area in sq ft)."""
+    if isinstance(opening, (int, float)):
+        return float(opening)
+    count = int(opening.get("count", 1))
+    if opening.get("area") is not None:
+        return float(opening["area"]) * count
+    width, height = opening.get("width"), opening.get("height")
+    if width is not None and height is not None:
+        return float(width) * float(height) * count
+    standard = STANDARD_OPENINGS.get(str(opening.get("type", "")).lower())
+    if standard is None:
+        raise ValueError(f"Opening {opening!r}: give a width and height, an area, or a type "
+                         f"({', '.join(STANDARD_OPENINGS)})")
+    return float(standard["area"]) * count
+
+
+def _rectangle(room) -> List[Tuple[float, float]]:
+    """The `length` x `width` box as a four-wall outline (walls L, W, L, W)."""
+    length, width = float(room["length"]), float(room["width"])
+    return [(0.0, 0.0), (length, 0.0), (length, width), (0.0, width)]
+
+
+def has_geometry(room) -> bool:
+    fields = _fields(room)
+    return any(fields.get(key) not in (None, "", []) for key in GEOMETRY_KEYS)
+
+
+def pack_geometry(rooms: Iterable) -> Dict[str, np.ndarray]:
+    """Outline / wall-height / opening columns for `rooms`; {} when no room has any.
+
+    corner_start   (rooms + 1) offsets into the corner arrays
+    corner_x/y     corner coordinates, room after room
+    wall_height    one per wall (NaN = the room's height)
+    opening_area   explicit opening area per room (NaN = doors/windows counts)
+    """
+    rooms = rooms if isinstance(rooms, list) else list(rooms)
+    if not any(has_geometry(r) for r in rooms):
+        return {}
+    counts, xs, ys, heights = [], [], [], []
+    openings = np.full(len(rooms), np.nan)
+    for i, room in enumerate(rooms):
+        fields = _fields(room)
+        try:
+            corners = parse_outline(fields.get("outline")) or []
+            walls = _parsed(fields.get("wall_heights")) or []
+            if walls and not corners:
+                corners = _rectangle(room)
+            if len(walls) > len(corners):
+                raise ValueError(f"{len(walls)} wall heights for {len(corners)} walls")
+            listed = _parsed(fields.get("openings"))
+            if listed not in (None, ""):
+                openings[i] = sum(opening_area(o) for o in listed)
+        except ValueError as e:
+            room_id = room.get("id") if isinstance(room, dict) else getattr(room, "id", i)
+            raise ValueError(f"Room {room_id}: {e}") from None
+        counts.append(len(corners))
+        xs.extend(x for x, _ in corners)
+        ys.extend(y for _, y in corners)
+        heights.extend(np.nan if h is None else float(h) for h in walls)
+        heights.extend([np.nan] * (len(corners) - len(walls)))
+    start = np.zeros(len(rooms) + 1, dtype=np.int64)
+    np.cumsum(counts, out=start[1:])
+    return {
+        "corner_start": start,
+        "corner_x": np.array(xs, dtype=np.float64),
+        "corner_y": np.array(ys, dtype=np.float64),
+        "wall_height": np.array(heights, dtype=np.float64),
+        "opening_area": openings,
+    }
+
+
+def outline_walls(columns: Dict[str, np.ndarray]):
+    """(perimeter, gross wall area, has_outline) per room from the packed corner columns."""
+    start = columns["corner_start"]
+    n = len(start) - 1
+    counts = np.diff(start)
+    x, y = columns["corner_x"], columns["corner_y"]
+    # Wall i runs from corner i to the next corner of the same room (the last wraps to the first).
+    following = np.arange(1, len(x) + 1)
+    rings = counts > 0
+    following[start[1:][rings] - 1] = start[:-1][rings]
+    length = np.hypot(x[following] - x, y[following] - y)
+    room_of = np.repeat(np.arange(n), counts)
+    height = columns["wall_height"]
+    height = np.where(np.isnan(height), columns["height"][room_of], height)
+    perimeter = np.bincount(room_of, weights=length, minlength=n)
+    gross = np.bincount(room_of, weights=length * height, minlength=n)
+    return perimeter, gross, rings
+
+
+def perimeters(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Wall length of every room (outline perimeter, else 2 * (L + W))."""
+    perimeter = 2 * (columns["length"] + columns["width"])
+    if "corner_start" in columns:
+        outline, _, rings = outline_walls(columns)
+        perimeter = np.where(rings, outline, perimeter)
+    return perimeter
+
+
+def wall_areas(columns: Dict[str, np.ndarray]):
+    """Unrounded (gross, net) wall area of every room."""
+    L, W, H = columns['length'], columns['width'], columns['height']
+    gross = np.maximum(0.0, 2 * (L + W) * H)
+    if "corner_start" in columns:
+        _, outline, rings = outline_walls(columns)
+        gross = np.where(rings, np.maximum(0.0, outline), gross)
+
+    door_area = np.maximum(0, columns['doors']) * STANDARD_OPENINGS['door']['area']
+    window_area = np.maximum(0, columns['windows']) * STANDARD_OPENINGS['window']['area']
+    net = np.maximum(0.0, gross - door_area - window_area)
+    if "opening_area" in columns:
+        explicit = columns["opening_area"]
+        net = np.where(np.isnan(explicit), net, np.maximum(0.0, gross - np.nan_to_num(explicit)))
+    return gross, net
@@ -0,0 +1,364 @@
+"""Local takeoff job service: a bounded queue in front of a worker-process pool.
+
+Plan sets are submitted as jobs; each runs the usual pipeline (extract ->
+process_takeoff -> generate_workbook / generate_floor_plan_svg) in a worker
+process, so a heavy plan set never blocks the caller. At most `workers`
+jobs run at once and at most `max_queued` wait; past that `submit` raises
+`QueueFull` (HTTP 429) instead of letting work pile up.
+
+    service = JobService(workers=2)
+    job_id = service.submit("plans.pdf")
+    service.status(job_id)["state"]        # queued -> running -> done | failed
+    rooms_data, results = service.result(job_id)   # read back from the job directory
+    service.artifact(job_id, "bid_package.xlsx")
+
+`serve()` exposes the same API over HTTP (`python main.py serve`):
+
+    POST /jobs?name=plans.pdf[&real_extract=1]   body: PDF bytes -> 202 {"id", ...} (re-POST retries a failed job)
+    GET  /jobs                                   queue stats + every job's status
+    GET  /jobs/<id>                              status
+    GET  /jobs/<id>/<artifact>                   bid_package.xlsx | floor_plan.svg | summary.json
+"""
+
+import json
+import multiprocessing
+import queue
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.batch_runner import run_one
+from src.floor_visualizer import generate_floor_plan_svg
+from src.takeoff_cache import DEFAULT_CACHE_DIR, TakeoffCache, cache_key, file_digest
+
+DEFAULT_WORK_DIR = ".paintpilot_jobs"
+DEFAULT_MAX_QUEUED = 8
+DEFAULT_KEEP_JOBS = 64
+JOB_STATES = ("queued", "running", "done", "failed")
+ARTIFACTS = {
+    "bid_package.xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "floor_plan.svg": "image/svg+xml",
+    "summary.json": "application/json",
+}
+SUMMARY_KEYS = ("project", "floor", "rooms", "net_area", "total_gallons", "rolls", "cached", "seconds")
+# Each finished job's (rooms_data, results), stored by the worker in a
+# TakeoffCache under the job directory: the service keeps none in memory, and
+# unlike the shared cache it is never evicted before the job is.
+TAKEOFF_DIR = "takeoff"
+
+
+class QueueFull(RuntimeError):
+    """Every worker is busy and the queue is at `max_queued`; retry later."""
+
+
+def run_job(spec: Dict) -> Dict:
+    """Worker entry point: `batch_runner.run_one`, the floor-plan SVG and the stored takeoff; never raises."""
+    job_dir = Path(spec["dir"])
+    status = run_one({
+        "input": spec["input"],
+        "output": str(job_dir / "bid_package.xlsx"),
+        "real_extract": spec["real_extract"],
+        "cache_dir": spec["cache_dir"],
+        "keep_results": True,
+        "keep_rooms": True,
+    })
+    if status["ok"]:
+        # Only the summary travels back to the service process.
+        rooms_data, results = status.pop("rooms_data"), status.pop("results")
+        try:
+            (job_dir / "floor_plan.svg").write_text(generate_floor_plan_svg(rooms_data), encoding="utf-8")
+            TakeoffCache(job_dir / TAKEOFF_DIR, max_bytes=sys.maxsize).put(spec["key"], rooms_data, results)
+        except Exception as exc:
+            status.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+    summary = {k: status[k] for k in SUMMARY_KEYS if k in status}
+    (job_dir / "summary.json").write_text(json.dumps(summary, indent=1), encoding="utf-8")
+    return status
+
+
+class Job:
+    """Bookkeeping for one submitted plan set (lives in the service process)."""
+
+    __slots__ = ("id", "key", "name", "dir", "spec", "state", "submitted_at", "started_at", "finished_at",
+                 "summary", "error")
+
+    def __init__(self, job_id: str, key: str, name: str, job_dir: Path, spec: Dict):
+        self.id = job_id
+        self.key = key
+        self.name = name
+        self.dir = job_dir
+        self.spec = spec
+        self.state = "queued"
+        self.submitted_at = time.time()
+        self.started_at = self.finished_at = None
+        self.summary: Dict = {}
+        self.error: Optional[str] = None
+
+    def status(self) -> Dict:
+        status = {"id": self.id, "name": self.name, "state": self.state, "submitted_at": self.submitted_at,
+                  "started_at": self.started_at, "finished_at": self.finished_at}
+        if self.state == "done":
+            status["summary"] = self.summary
+            status["artifacts"] = [name for name in ARTIFACTS if (self.dir / name).exists()]
+        elif self.state == "failed":
+            status["error"] = self.error
+        return status
+
+
+class JobService:
+    """Bounded job queue feeding a pool of worker processes.
+
+    Submitting a plan set that is already queued, running or done (same file
+    hash, config and extractor) returns the existing job instead of a new one.
+    Finished jobs beyond `keep_jobs` are dropped with their artifacts, oldest
+    first.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queued: int = DEFAULT_MAX_QUEUED,
+                 work_dir=DEFAULT_WORK_DIR, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 keep_jobs: int = DEFAULT_KEEP_JOBS):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_queued = max_queued
+        self.work_dir = Path(work_dir)
+        self.cache_dir = cache_dir
+        self.keep_jobs = keep_jobs
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_queued)
+        self._slots = threading.Semaphore(self.workers)
+        self._pool = self._new_pool()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="paintpilot-jobs", daemon=True)
+        self._dispatcher.start()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # --- API ---
+
+    def submit(self, pdf_source, real_extract: bool = False, name: Optional[str] = None,
+               key: Optional[str] = None, retry: bool = False) -> str:
+        """Queue a plan set (path, bytes or file-like); returns the job id.
+
+        Pass `key` (from `takeoff_cache.cache_key`) when the file hash is
+        already known. An identical plan set returns its existing job, a
+        failed one included unless `retry` asks for a new attempt. Raises
+        `QueueFull` when the queue is at capacity.
+        """
+        if self._closed:
+            raise RuntimeError("JobService is closed")
+        extractor = "pdfplumber" if real_extract else "mock"
+        key = key or cache_key(None, extractor, digest=file_digest(pdf_source))
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing and (existing.state != "failed" or not retry):
+                return existing.id
+            job_id = uuid.uuid4().hex[:12]
+            job_dir = self.work_dir / job_id
+            job_dir.mkdir(parents=True)
+            if isinstance(pdf_source, (str, Path)):
+                input_path = str(pdf_source)
+                name = name or Path(pdf_source).name
+            else:
+                input_path = str(job_dir / "input.pdf")
+                data = pdf_source if isinstance(pdf_source, (bytes, bytearray, memoryview)) else (
+                    pdf_source.getvalue() if hasattr(pdf_source, "getvalue") else pdf_source.read())
+                Path(input_path).write_bytes(data)
+                name = name or Path(getattr(pdf_source, "name", None) or "upload.pdf").name
+            spec = {"input": input_path, "dir": str(job_dir), "key": key, "real_extract": real_extract,
+                    "cache_dir": self.cache_dir}
+            job = Job(job_id, key, name, job_dir, spec)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                raise QueueFull(f"{self.max_queued} jobs already waiting; retry later") from None
+            self._jobs[job_id] = job
+            self._by_key[key] = job_id
+        return job_id
+
+    def _job(self, job_id: str) -> Job:
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise KeyError(f"Unknown job {job_id!r}") from None
+
+    def status(self, job_id: str) -> Dict:
+        job = self._job(job_id)
+        status = job.status()
+        if job.state == "queued":
+            with self._lock:
+                status["position"] = sum(1 for j in self._jobs.values()
+                                         if j.state == "queued" and j.submitted_at <= job.submitted_at)
+        return status
+
+    def result(self, job_id: str) -> Tuple[Dict, object]:
+        """(rooms_data, results) of a finished job, loaded from its directory on every call."""
+        job = self._job(job_id)
+        if job.state != "done":
+            raise RuntimeError(f"Job {job_id} is {job.state}" + (f": {job.error}" if job.error else ""))
+        takeoff = TakeoffCache(job.dir / TAKEOFF_DIR, max_bytes=sys.maxsize).get(job.key)
+        if takeoff is None:
+            raise RuntimeError(f"Job {job_id} has no stored takeoff")
+        return takeoff
+
+    def artifact(self, job_id: str, name: str) -> Path:
+        """Path of a finished job's artifact (see ARTIFACTS)."""
+        job = self._job(job_id)
+        path = job.dir / name
+        if name not in ARTIFACTS or job.state != "done" or not path.exists():
+            raise KeyError(f"Job {job_id} has no artifact {name!r}")
+        return path
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.05) -> Dict:
+        """Poll until the job is done or failed (or `timeout` seconds pass)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status["state"] in ("done", "failed") or (deadline and time.monotonic() >= deadline):
+                return status
+            time.sleep(interval)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            states = [j.state for j in self._jobs.values()]
+        return {"workers": self.workers, "max_queued": self.max_queued,
+                **{state: states.count(state) for state in JOB_STATES}}
+
+    def jobs(self):
+        with self._lock:
+            return [job.status() for job in self._jobs.values()]
+
+    def close(self, wait: bool = True) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        while True:  # jobs that never started fail rather than hang
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            job.state, job.error, job.finished_at = "failed", "JobService closed", time.time()
+        self._queue.put(None)
+        self._slots.release()  # in case every worker slot is taken
+        self._dispatcher.join(timeout=5)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    # --- dispatch (one thread) ---
+
+    def _dispatch(self) -> None:
+        # Take a worker slot first, then a job, so queued jobs stay queued (and
+        # count against max_queued) until a worker can actually start them.
+        while True:
+            self._slots.acquire()
+            job = self._queue.get()
+            if job is None or self._closed:
+                return
+            job.state = "running"
+            job.started_at = time.time()
+            try:
+                try:
+                    future = self._pool.submit(run_job, job.spec)
+                except BrokenProcessPool:  # a worker died; start a fresh pool
+                    self._pool = self._new_pool()
+                    future = self._pool.submit(run_job, job.spec)
+            except Exception as exc:
+                future = Future()
+                future.set_exception(exc)
+            future.add_done_callback(lambda f, job=job: self._finish(job, f))
+
+    def _finish(self, job: Job, future) -> None:
+        try:
+            status = future.result()
+        except Exception as exc:  # worker crashed (killed, BrokenProcessPool)
+            status = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        job.finished_at = time.time()
+        (job.dir / "input.pdf").unlink(missing_ok=True)  # uploads only; path inputs aren't copied
+        if status["ok"]:
+            job.summary = {k: status[k] for k in SUMMARY_KEYS if k in status}
+            job.state = "done"
+        else:
+            job.error = status["error"]
+            job.state = "failed"
+        self._slots.release()
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.state in ("done", "failed")]
+            for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+                del self._jobs[job.id]
+                if self._by_key.get(job.key) == job.id:
+                    del self._by_key[job.key]
+                shutil.rmtree(job.dir, ignore_errors=True)
+
+
+# === HTTP front end ===
+
+class _Handler(BaseHTTPRequestHandler):
+    service: JobService = None  # set by serve()
+
+    def _send(self, code: int, body, content_type: str = "application/json", headers=None) -> None:
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send(HTTPStatus.NOT_FOUND, {"error": "POST /jobs"})
+        params = parse_qs(url.query)
+        data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not data:
+            return self._send(HTTPStatus.BAD_REQUEST, {"error": "empty body; send the PDF bytes"})
+        real_extract = params.get("real_extract", ["0"])[0].lower() in ("1", "true", "yes")
+        try:
+            job_id = self.service.submit(data, real_extract, name=params.get("name", [None])[0], retry=True)
+        except QueueFull as exc:
+            return self._send(HTTPStatus.TOO_MANY_REQUESTS, {"error": str(exc)}, headers={"Retry-After": "5"})
+        self._send(HTTPStatus.ACCEPTED, self.service.status(job_id), headers={"Location": f"/jobs/{job_id}"})
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts[:1] != ["jobs"] or len(parts) > 3:
+            return self._send(HTTPStatus.NOT_FOUND, {"error": "GET /jobs, /jobs/<id> or /jobs/<id>/<artifact>"})
+        try:
+            if len(parts) == 1:
+                return self._send(HTTPStatus.OK, {**self.service.stats(), "jobs": self.service.jobs()})
+            if len(parts) == 2:
+                return self._send(HTTPStatus.OK, self.service.status(parts[1]))
+            path = self.service.artifact(parts[1], parts[2])
+        except KeyError as exc:
+            return self._send(HTTPStatus.NOT_FOUND, {"error": exc.args[0]})
+        self._send(HTTPStatus.OK, path.read_bytes(), ARTIFACTS[parts[2]])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service: JobService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server for `service` (call `serve_forever()` on it)."""
+    handler = type("JobHandler", (_Handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,324 @@
+"""Compact room and takeoff-result types.
+
+`Room`, `Materials` and `TakeoffResult` are `__slots__` records that also
+behave as read-only mappings, so existing code that does `r['room']['id']`
+or `r['materials'].get('rolls')` keeps working (and they compare equal to the
+equivalent plain dicts). `TakeoffResults` is the struct-of-arrays container
+`process_takeoff` returns: one NumPy column per quantity plus the list of
+rooms; result records are only materialized when a row is accessed, and
+`to_dataframe()` hands the columns to pandas without building per-row dicts.
+`rollup()` groups the result set by floor, room type and finish system
+(`src.rollups`) and is cached until the results are edited.
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.finish_systems import QUANTITY_FIELDS, REGISTRY
+from src.geometry import pack_geometry
+
+_finish_code = REGISTRY.code
+
+ROOM_FIELDS = ("id", "name", "length", "width", "height", "doors", "windows", "finish_type", "floor")
+RESULT_COLUMNS = ("gross_area", "net_area") + QUANTITY_FIELDS
+RESULT_KEYS = ("room", "gross_area", "net_area", "materials")
+
+
+class Room(Mapping):
+    """One room. Unknown input keys are kept in `extra`; `floor` is optional."""
+
+    __slots__ = ROOM_FIELDS + ("extra",)
+
+    def __init__(self, id, name, length, width, height, doors=0, windows=0,
+                 finish_type="paint", floor=None, extra=None):
+        self.id = id
+        self.name = name
+        self.length = length
+        self.width = width
+        self.height = height
+        self.doors = doors
+        self.windows = windows
+        self.finish_type = finish_type
+        self.floor = floor
+        self.extra = extra
+
+    @classmethod
+    def from_mapping(cls, data) -> "Room":
+        if isinstance(data, Room):
+            return data
+        extra = {k: v for k, v in data.items() if k not in ROOM_FIELDS} or None
+        # Only the dimensions are required; unnamed rooms go by their id.
+        room_id = data.get("id")
+        name = data.get("name") or (f"Room {room_id}" if room_id is not None else "Room")
+        return cls(
+            room_id, name, data["length"], data["width"], data["height"],
+            data.get("doors", 0), data.get("windows", 0), data.get("finish_type", "paint"),
+            data.get("floor"), extra,
+        )
+
+    def _keys(self):
+        keys = ROOM_FIELDS if self.floor is not None else ROOM_FIELDS[:-1]
+        return keys + tuple(self.extra) if self.extra else keys
+
+    def __getitem__(self, key):
+        if key in ROOM_FIELDS:
+            value = getattr(self, key)
+            if key == "floor" and value is None:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"Room({self.to_dict()!r})"
+
+    def replace(self, **changes) -> "Room":
+        return Room.from_mapping({**self, **changes})
+
+    def to_dict(self) -> Dict:
+        return {k: self[k] for k in self._keys()}
+
+
+class Materials(Mapping):
+    """Material quantities; keys are `type` plus the finish system's fields."""
+
+    __slots__ = ("type", "primer_gallons", "finish_gallons", "total_gallons", "rolls")
+
+    def __init__(self, type, primer_gallons=None, finish_gallons=None, total_gallons=None, rolls=None):
+        self.type = type
+        self.primer_gallons = primer_gallons
+        self.finish_gallons = finish_gallons
+        self.total_gallons = total_gallons
+        self.rolls = rolls
+
+    def _keys(self):
+        return REGISTRY.material_keys(self.type)
+
+    def __getitem__(self, key):
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"Materials({dict(self)!r})"
+
+
+class TakeoffResult(Mapping):
+    """One room's takeoff: `room`, `gross_area`, `net_area`, `materials`."""
+
+    __slots__ = RESULT_KEYS
+
+    def __init__(self, room, gross_area, net_area, materials):
+        self.room = room
+        self.gross_area = gross_area
+        self.net_area = net_area
+        self.materials = materials
+
+    def __getitem__(self, key):
+        if key not in RESULT_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(RESULT_KEYS)
+
+    def __len__(self):
+        return len(RESULT_KEYS)
+
+    def __repr__(self) -> str:
+        return (f"TakeoffResult(room={self.room!r}, gross_area={self.gross_area!r}, "
+                f"net_area={self.net_area!r}, materials={self.materials!r})")
+
+    def to_dict(self) -> Dict:
+        room = self.room.to_dict() if isinstance(self.room, Room) else dict(self.room)
+        return {"room": room, "gross_area": self.gross_area, "net_area": self.net_area,
+                "materials": dict(self.materials)}
+
+
+def room_columns(rooms: List[Room]) -> Dict[str, np.ndarray]:
+    """`batch_engine.rooms_to_columns` for Room records (attribute access)."""
+    n = len(rooms)
+    columns = {
+        "length": np.fromiter((r.length for r in rooms), dtype=np.float64, count=n),
+        "width": np.fromiter((r.width for r in rooms), dtype=np.float64, count=n),
+        "height": np.fromiter((r.height for r in rooms), dtype=np.float64, count=n),
+        "doors": np.fromiter((int(r.doors) for r in rooms), dtype=np.int64, count=n),
+        "windows": np.fromiter((int(r.windows) for r in rooms), dtype=np.int64, count=n),
+        "finish": np.fromiter((_finish_code(r.finish_type) for r in rooms), dtype=np.int16, count=n),
+    }
+    columns.update(pack_geometry(rooms))
+    return columns
+
+
+def _py(value) -> Optional[float]:
+    value = float(value)
+    return None if value != value else value  # NaN -> None
+
+
+def _none(value):
+    return None if value != value else value
+
+
+class TakeoffResults(Sequence):
+    """Struct-of-arrays takeoff results (what `process_takeoff` returns).
+
+    Supports `len`, indexing, iteration (yielding `TakeoffResult`), equality
+    with a list of result dicts, and in-place row updates for editing.
+    """
+
+    __slots__ = ("rooms", "columns", "_rollups")
+
+    def __init__(self, rooms: List[Room], columns: Dict[str, np.ndarray]):
+        self.rooms = rooms
+        self.columns = columns
+        self._rollups: Dict = {}
+
+    @classmethod
+    def from_results(cls, results: Iterable) -> "TakeoffResults":
+        """Pack any iterable of result mappings (dicts or records)."""
+        if isinstance(results, TakeoffResults):
+            return results
+        rooms, rows, codes = [], [], []
+        for r in results:
+            m = r["materials"]
+            rooms.append(Room.from_mapping(r["room"]))
+            rows.append([r["gross_area"], r["net_area"], m.get("primer_gallons"), m.get("finish_gallons"),
+                         m.get("total_gallons"), m.get("rolls")])
+            codes.append(_finish_code(m["type"]))
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), len(RESULT_COLUMNS))
+        columns = {name: data[:, i].copy() for i, name in enumerate(RESULT_COLUMNS)}
+        columns["finish"] = np.array(codes, dtype=np.int16)
+        return cls(rooms, columns)
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def _record(self, i: int) -> TakeoffResult:
+        c = self.columns
+        materials = Materials(REGISTRY.names[c["finish"][i]], *(_py(c[f][i]) for f in QUANTITY_FIELDS))
+        return TakeoffResult(self.rooms[i], _py(c["gross_area"][i]), _py(c["net_area"][i]), materials)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TakeoffResults index out of range")
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[TakeoffResult]:
+        # Pull whole columns once instead of indexing NumPy per field.
+        c = self.columns
+        rows = zip(self.rooms, c["gross_area"].tolist(), c["net_area"].tolist(), c["primer_gallons"].tolist(),
+                   c["finish_gallons"].tolist(), c["total_gallons"].tolist(), c["rolls"].tolist(),
+                   c["finish"].tolist())
+        names = REGISTRY.names
+        for room, gross, net, primer, finish, total, rolls, code in rows:
+            materials = Materials(names[code], _none(primer), _none(finish), _none(total), _none(rolls))
+            yield TakeoffResult(room, gross, net, materials)
+
+    def __eq__(self, other):
+        if isinstance(other, (Sequence, TakeoffResults)) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    # --- editing (used by TakeoffSession) ---
+
+    def copy(self) -> "TakeoffResults":
+        return TakeoffResults(list(self.rooms), {k: v.copy() for k, v in self.columns.items()})
+
+    def _row_values(self, result) -> Dict:
+        m = result["materials"]
+        values = {"gross_area": result["gross_area"], "net_area": result["net_area"],
+                  "finish": _finish_code(m["type"])}
+        for name in RESULT_COLUMNS[2:]:
+            value = m.get(name)
+            values[name] = np.nan if value is None else value
+        return values
+
+    def __setitem__(self, index: int, result) -> None:
+        self._rollups.clear()
+        self.rooms[index] = Room.from_mapping(result["room"])
+        for name, value in self._row_values(result).items():
+            self.columns[name][index] = value
+
+    def append(self, result) -> None:
+        self._rollups.clear()
+        self.rooms.append(Room.from_mapping(result["room"]))
+        for name, value in self._row_values(result).items():
+            self.columns[name] = np.append(self.columns[name], value).astype(self.columns[name].dtype)
+
+    def pop(self, index: int) -> TakeoffResult:
+        record = self[index]
+        self._rollups.clear()
+        del self.rooms[index]
+        for name in self.columns:
+            self.columns[name] = np.delete(self.columns[name], index)
+        return record
+
+    # --- bulk views ---
+
+    def rollup(self, project: Optional[str] = None, floor: Optional[str] = None):
+        """Project/floor/room type/system sums (`rollups.Rollup`), cached until the next edit.
+
+        `floor` labels rooms that carry no floor of their own.
+        """
+        key = (project, floor)
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            from src.rollups import Rollup
+
+            rollup = self._rollups[key] = Rollup.from_columns(self.rooms, self.columns, project, floor)
+        return rollup
+
+    def breakdown_rows(self) -> Iterator[list]:
+        """Room Breakdown sheet rows straight from the columns."""
+        c = self.columns
+        rows = zip(self.rooms, c["gross_area"].tolist(), c["net_area"].tolist(), c["primer_gallons"].tolist(),
+                   c["finish_gallons"].tolist(), c["total_gallons"].tolist(), c["rolls"].tolist(),
+                   c["finish"].tolist())
+        names = REGISTRY.names
+        for room, gross, net, primer, finish, total, rolls, code in rows:
+            yield [room.id, room.name, room.length, room.width, room.height, room.doors, room.windows,
+                   names[code], gross, net, _none(primer), _none(finish), _none(total), _none(rolls)]
+
+    def to_dataframe(self, labels: Optional[Dict[str, str]] = None):
+        """DataFrame of room inputs + results; numeric result columns are passed as arrays."""
+        import pandas as pd
+
+        c = self.columns
+        data = {
+            "id": [r.id for r in self.rooms],
+            "name": [r.name for r in self.rooms],
+            "length": [r.length for r in self.rooms],
+            "width": [r.width for r in self.rooms],
+            "height": [r.height for r in self.rooms],
+            "doors": [r.doors for r in self.rooms],
+            "windows": [r.windows for r in self.rooms],
+            "finish_type": np.asarray(REGISTRY.names, dtype=object)[c["finish"]],
+            **{name: c[name] for name in RESULT_COLUMNS},
+        }
+        df = pd.DataFrame(data, copy=False)
+        return df.rename(columns=labels) if labels else df
+
+    def to_dicts(self) -> List[Dict]:
+        """Legacy list-of-dicts form (e.g. for JSON)."""
+        return [r.to_dict() for r in self]
@@ -0,0 +1,120 @@
+"""Page index: a cheap pre-scan that tells room extraction which pages to open.
+
+Real plan sets mix schedules with floor plans, elevations and spec pages,
+and pdfplumber's table extraction costs ~100 ms a page whether or not the
+page holds a schedule. The pre-scan reads only the page tree and each
+page's plain text (pypdfium2, which pdfplumber already depends on; PyPDF2
+as a fallback), about 1-10 ms a page, and classifies every page:
+
+    room_schedule / finish_schedule   header lines with a room id/name and a size column
+    floor_plan                        a "plan" sheet without such a header
+    other                             elevations, specs, cover sheets...
+    unknown                           text could not be read: always extracted
+
+Only the two schedule kinds (and unknown pages) are parsed. The index is
+stored in the takeoff cache under the file's sha256, so it is built once per
+plan set no matter how often the config or extractor changes.
+
+    index = load_page_index("plans.pdf", cache)
+    index["pages"], index["kinds"], pages_to_extract(index)
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+from src.pdf_processor import _PROJECT, HEADER_ALIASES
+
+INDEX_VERSION = 2
+PAGE_KINDS = ("room_schedule", "finish_schedule", "floor_plan", "other", "unknown")
+EXTRACT_KINDS = ("room_schedule", "finish_schedule", "unknown")
+# A schedule header may wrap over this many text lines.
+HEADER_LINES = 3
+
+_WORD = re.compile(r"[a-z_]+")
+# Aliases shorter than this ("l", "w", "no", "rm") are everyday words and
+# abbreviations on spec and notes pages ("no.", "w/", "l.f."), not header evidence.
+MIN_HEADER_WORD = 3
+_ID_WORDS = frozenset(w for alias, key in HEADER_ALIASES.items() if key in ("id", "name")
+                      for w in alias.split() if len(w) >= MIN_HEADER_WORD)
+_SIZE_WORDS = frozenset(alias for alias, key in HEADER_ALIASES.items()
+                        if key in ("length", "width", "size") and " " not in alias
+                        and len(alias) >= MIN_HEADER_WORD)
+
+
+def classify_page(text: Optional[str]) -> str:
+    """Page kind from its plain text (None = unreadable)."""
+    if text is None:
+        return "unknown"
+    lines = [set(_WORD.findall(line)) for line in text.lower().splitlines()]
+    words = set().union(*lines)
+    if words & _ID_WORDS and words & _SIZE_WORDS:
+        for i in range(len(lines)):
+            window = set().union(*lines[i:i + HEADER_LINES])
+            if window & _ID_WORDS and window & _SIZE_WORDS:
+                return "finish_schedule" if "finish" in words else "room_schedule"
+    return "floor_plan" if "plan" in words else "other"
+
+
+def _page_texts(pdf_path) -> Iterator[Optional[str]]:
+    """Plain text of every page, in order; None for a page whose text can't be read."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            for i in range(len(pdf)):
+                page = pdf[i]
+                try:
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                except pdfium.PdfiumError:
+                    text = None
+                finally:
+                    page.close()
+                yield text
+        finally:
+            pdf.close()
+        return
+    from PyPDF2 import PdfReader
+
+    for page in PdfReader(str(pdf_path)).pages:
+        try:
+            yield page.extract_text()
+        except Exception:  # malformed content stream; let pdfplumber try
+            yield None
+
+
+def scan_pdf(pdf_path) -> Dict:
+    """Build the page index of one PDF (no caching)."""
+    kinds: List[str] = []
+    project = None
+    for text in _page_texts(pdf_path):
+        kinds.append(classify_page(text))
+        if project is None and text:
+            m = _PROJECT.search(text)
+            project = m.group(1) if m else None
+    return {"version": INDEX_VERSION, "pages": len(kinds), "kinds": kinds, "project": project,
+            "counts": dict(Counter(kinds))}
+
+
+def load_page_index(pdf_path, cache=None, digest: Optional[str] = None) -> Dict:
+    """Page index for `pdf_path`, read from / stored in `cache` (a TakeoffCache) when given."""
+    if cache is None:
+        return scan_pdf(pdf_path)
+    from src.takeoff_cache import file_digest
+
+    digest = digest or file_digest(pdf_path)
+    index = cache.get_page_index(digest, INDEX_VERSION)
+    if index is None:
+        index = scan_pdf(pdf_path)
+        cache.put_page_index(digest, INDEX_VERSION, index)
+    return index
+
+
+def pages_to_extract(index: Dict) -> List[int]:
+    """0-based page numbers room extraction has to parse."""
+    return [i for i, kind in enumerate(index["kinds"]) if kind in EXTRACT_KINDS]
@@ -1,14 +1,37 @@
 # For the demo we keep extraction deterministic and fast.
-# Swap with real parsing later (pdfplumber/PyPDF2/LLM extraction).
+# `extract_rooms_from_pdf` is the real pdfplumber path; it streams pages
+# through a process pool and returns the same rooms_data shape as the mock.
+# A cheap pre-scan (src/page_index.py) picks the schedule pages it parses.
 
-from typing import Dict, Any
+import io
+import os
+import re
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
 
-def extract_metadata(pdf_path: str) -> Dict[str, Any]:
-    """Extract basic metadata (mock for demo)."""
+from src.config import DEFAULT_WALL_HEIGHTS
+from src.finish_systems import REGISTRY
+
+def extract_metadata(pdf_path: str, cache=None) -> Dict[str, Any]:
+    """Page count, project title and page index (see src/page_index.py).
+
+    Files that can't be read as a PDF (the demo accepts anything) report no
+    pages and no index. Pass a TakeoffCache to reuse / store the index.
+    """
+    from src.page_index import load_page_index
+
+    try:
+        index = load_page_index(pdf_path, cache)
+    except Exception:  # not a PDF, or too damaged for the pre-scan
+        index = None
     return {
         "file": str(pdf_path),
-        "pages": 12,   # mock
-        "project": "AC Wallcovering Office – 2nd Floor",
+        "pages": index["pages"] if index else 0,
+        "project": (index and index["project"]) or Path(pdf_path).stem,
+        "page_index": index,
     }
 
 def mock_room_extraction(pdf_path) -> Dict[str, Any]:
@@ -27,3 +50,222 @@ def mock_room_extraction(pdf_path) -> Dict[str, Any]:
             {"id": "208", "name": "Storage",          "length": 10, "width": 8,  "height": 9,  "doors": 1, "windows": 0, "finish_type": "paint"},
         ],
     }
+
+# === Real extraction ===
+
+PAGES_PER_TASK = 8          # pages handed to a worker at a time
+MIN_PAGES_FOR_POOL = 16     # below this, pool start-up costs more than it saves
+TASKS_PER_WORKER = 2        # tasks submitted ahead per worker (bounds pages in flight)
+
+# Normalized schedule header -> room key
+HEADER_ALIASES = {
+    "room": "id", "room no": "id", "room number": "id", "rm": "id", "no": "id", "id": "id", "number": "id",
+    "name": "name", "room name": "name", "description": "name",
+    "length": "length", "len": "length", "l": "length",
+    "width": "width", "w": "width",
+    "height": "height", "h": "height", "ceiling": "height", "ceiling height": "height", "clg ht": "height",
+    "doors": "doors", "door": "doors", "no doors": "doors",
+    "windows": "windows", "window": "windows", "no windows": "windows",
+    "finish": "finish_type", "finish type": "finish_type", "wall finish": "finish_type", "walls": "finish_type",
+    "size": "size", "dimensions": "size", "dims": "size", "room size": "size",
+    "finish_type": "finish_type", "room_id": "id", "floor": "floor", "level": "floor",
+}
+
+_FEET_INCHES = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*['’′]\s*(?:-?\s*(\d+(?:\.\d+)?)\s*(?:\"|”|″|'')?)?\s*$")
+_DIM_SPLIT = re.compile(r"\s*[xX×]\s*")
+_PROJECT = re.compile(r"^\s*PROJECT\s*:\s*(.+?)\s*$", re.I | re.M)
+_FLOOR = re.compile(r"^\s*(?:FLOOR|LEVEL)\s*:\s*(.+?)\s*$", re.I | re.M)
+
+def _normalize_header(cell) -> str:
+    text = re.sub(r"\(.*?\)|[#.:]", " ", str(cell or "").lower())
+    return " ".join(text.split())
+
+def parse_feet(value) -> Optional[float]:
+    """Parse 20, 20.5, 20' or 20'-6" into decimal feet."""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    m = _FEET_INCHES.match(text)
+    if m:
+        return float(m.group(1)) + float(m.group(2) or 0) / 12
+    return None
+
+def _parse_count(value) -> int:
+    m = re.search(r"\d+", str(value or ""))
+    return int(m.group()) if m else 0
+
+def _parse_finish(value) -> str:
+    # System names, labels and aliases come from the finish-system registry.
+    return REGISTRY.match(str(value or ""))
+
+def _rooms_from_table(table: List[List], floor: Optional[str]) -> List[Dict]:
+    if not table or len(table) < 2:
+        return []
+    keys = [HEADER_ALIASES.get(_normalize_header(c)) for c in table[0]]
+    if "id" not in keys and "name" not in keys:
+        return []
+    if not ({"length", "width"} <= set(keys) or "size" in keys):
+        return []
+
+    rooms = []
+    for row in table[1:]:
+        room = room_from_cells({k: v for k, v in zip(keys, row) if k and v not in (None, "")}, floor)
+        if room:
+            rooms.append(room)
+    return rooms
+
+def room_from_cells(cells: Dict[str, Any], floor: Optional[str] = None) -> Optional[Dict]:
+    """Build a room dict from one schedule row keyed by room key (see HEADER_ALIASES).
+
+    Returns None when the row has no id/name or no usable length and width.
+    Also used for CSV/NDJSON room lists (`src/room_stream.py`).
+    """
+    length, width, height = parse_feet(cells.get("length")), parse_feet(cells.get("width")), parse_feet(cells.get("height"))
+    if "size" in cells:
+        dims = [parse_feet(d) for d in _DIM_SPLIT.split(str(cells["size"]).strip())]
+        length = length or (dims[0] if len(dims) > 0 else None)
+        width = width or (dims[1] if len(dims) > 1 else None)
+        height = height or (dims[2] if len(dims) > 2 else None)
+    if not length or not width or not (cells.get("id") or cells.get("name")):
+        return None
+    room = {
+        "id": str(cells.get("id") or cells.get("name")).strip(),
+        "name": " ".join(str(cells.get("name") or cells.get("id")).split()),
+        "length": length,
+        "width": width,
+        "height": height or DEFAULT_WALL_HEIGHTS["standard"],
+        "doors": _parse_count(cells.get("doors")),
+        "windows": _parse_count(cells.get("windows")),
+        "finish_type": _parse_finish(cells.get("finish_type")),
+    }
+    floor = cells.get("floor") or floor
+    if floor:
+        room["floor"] = str(floor)
+    return room
+
+def parse_page(page) -> Dict[str, Any]:
+    """Parse one pdfplumber page into {"page", "project", "floor", "rooms"}."""
+    text = page.extract_text() or ""
+    project = _PROJECT.search(text)
+    floor = _FLOOR.search(text)
+    floor = floor.group(1) if floor else None
+    tables = page.extract_tables()
+    if not tables and re.search(r"\b(width|length|dimensions)\b", text, re.I):
+        tables = page.extract_tables({"vertical_strategy": "text", "horizontal_strategy": "text"})
+    rooms = [room for table in tables for room in _rooms_from_table(table, floor)]
+    return {
+        "page": page.page_number,
+        "project": project.group(1) if project else None,
+        "floor": floor,
+        "rooms": rooms,
+    }
+
+def _parse_page_range(task) -> List[Dict[str, Any]]:
+    """Worker entry point: open the PDF, parse the listed pages, release each page."""
+    import pdfplumber
+
+    pdf_path, page_numbers = task
+    parsed = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in page_numbers:
+            page = pdf.pages[i]
+            parsed.append(parse_page(page))
+            page.close()
+    return parsed
+
+def iter_pdf_pages(pdf_path, workers: Optional[int] = None,
+                   pages: Optional[List[int]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield parsed pages in order, fanning page ranges out to a process pool.
+
+    `pages` (0-based, e.g. from `page_index.pages_to_extract`) limits parsing
+    to those pages; by default every page is parsed. At most
+    TASKS_PER_WORKER tasks of PAGES_PER_TASK pages per worker are submitted
+    ahead of the consumer, so memory stays flat regardless of the size of
+    the plan set.
+    """
+    if pages is None:
+        import pdfplumber  # here, not at import time: the mock/demo path never needs it
+
+        with pdfplumber.open(pdf_path) as pdf:
+            pages = list(range(len(pdf.pages)))
+    n_pages = len(pages)
+    tasks = [(str(pdf_path), pages[s:s + PAGES_PER_TASK]) for s in range(0, n_pages, PAGES_PER_TASK)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or n_pages < MIN_PAGES_FOR_POOL:
+        for task in tasks:
+            yield from _parse_page_range(task)
+        return
+    workers = min(workers, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A sliding window of futures: `pool.map` would submit every task up
+        # front and buffer results whenever the consumer falls behind.
+        pending = deque()
+        remaining = iter(tasks)
+        for task in remaining:
+            pending.append(pool.submit(_parse_page_range, task))
+            if len(pending) >= workers * TASKS_PER_WORKER:
+                break
+        while pending:
+            parsed = pending.popleft().result()
+            for task in remaining:
+                pending.append(pool.submit(_parse_page_range, task))
+                break
+            yield from parsed
+
+def _floor_label(floors: List[str]) -> str:
+    if not floors:
+        return ""
+    return floors[0] if len(floors) == 1 else f"{floors[0]} – {floors[-1]}"
+
+def extract_rooms_from_pdf(pdf_source, workers: Optional[int] = None, cache=None,
+                           page_index: Optional[Dict] = None) -> Dict[str, Any]:
+    """Extract rooms from real room/finish schedules in a PDF.
+
+    Accepts a path or a file-like object (e.g. a Streamlit upload), and returns
+    the same {"project", "floor", "rooms"} shape as `mock_room_extraction`.
+    Only the schedule pages of the page index are parsed; pass the index
+    (e.g. from `extract_metadata`) or a TakeoffCache to skip the pre-scan.
+    """
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return _extract_from_path(Path(pdf_source), workers, cache, page_index)
+
+    data = pdf_source.getvalue() if hasattr(pdf_source, "getvalue") else pdf_source.read()
+    name = Path(getattr(pdf_source, "name", "") or "upload.pdf").stem
+    # Worker processes need something they can open by path.
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        tmp.write(data)
+        tmp.flush()
+        rooms_data = _extract_from_path(Path(tmp.name), workers, cache, page_index)
+    if rooms_data["project"] == Path(tmp.name).stem:
+        rooms_data["project"] = name
+    return rooms_data
+
+def _extract_from_path(pdf_path: Path, workers: Optional[int], cache=None,
+                       page_index: Optional[Dict] = None) -> Dict[str, Any]:
+    from src.page_index import load_page_index, pages_to_extract
+
+    if page_index is None:
+        try:
+            page_index = load_page_index(pdf_path, cache)
+        except Exception:  # the pre-scan can't read it; let pdfplumber try every page
+            page_index = {"project": None}
+    pages = pages_to_extract(page_index) if "kinds" in page_index else None
+    project = None
+    floors: List[str] = []
+    rooms: List[Dict] = []
+    for parsed in iter_pdf_pages(pdf_path, workers, pages):
+        project = project or parsed["project"]
+        if parsed["floor"] and parsed["floor"] not in floors and parsed["rooms"]:
+            floors.append(parsed["floor"])
+        rooms.extend(parsed["rooms"])
+    return {
+        # A title block on a skipped page (e.g. the cover sheet) still names the project.
+        "project": project or page_index["project"] or pdf_path.stem,
+        "floor": _floor_label(floors),
+        "rooms": rooms,
+    }
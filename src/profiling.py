@@ -0,0 +1,251 @@
+"""Stage-level timing, peak memory and counters for the takeoff pipeline.
+
+Call sites wrap each stage in `stage(name)`; nothing is recorded unless a
+`Profiler` is active (`with Profiler().activate(): ...`), and the inactive
+path is a context-variable lookup plus a shared no-op context manager.
+
+    with Profiler().activate() as prof:
+        with stage("process_takeoff") as s:
+            results = process_takeoff(rooms_data)
+            s.count("rooms", len(results))
+    prof.write("output/profile.json")   # open in chrome://tracing or Perfetto
+
+Peak memory is measured two ways. `memory="rss"` (the default) reads the
+process high-water mark, which Linux lets us reset per stage through
+/proc/self/clear_refs; it costs nothing while the stage runs (elsewhere it
+falls back to a never-reset `getrusage` peak). `memory="tracemalloc"` counts
+Python allocations exactly but slows allocation-heavy stages several times
+over. Either way only this process is measured: work done in worker
+processes is timed but not memory-profiled.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MEMORY_MODES = ("rss", "tracemalloc", "off")
+
+_current: ContextVar[Optional["Profiler"]] = ContextVar("paintpilot_profiler", default=None)
+
+
+def _proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            match = re.search(rf"^{field}:\s+(\d+) kB", f.read(), re.M)
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+
+class _RssMeter:
+    """Resettable peak RSS (Linux), else the process-lifetime peak."""
+
+    def __init__(self):
+        self.resettable = _proc_status_kb("VmHWM") is not None and os.access("/proc/self/clear_refs", os.W_OK)
+
+    def current(self) -> int:
+        kb = _proc_status_kb("VmRSS") if self.resettable else None
+        return kb * 1024 if kb is not None else self.peak()
+
+    def peak(self) -> int:
+        if self.resettable:
+            return _proc_status_kb("VmHWM") * 1024
+        if resource is not None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return 0
+
+    def reset_peak(self) -> None:
+        if self.resettable:
+            try:
+                with open("/proc/self/clear_refs", "w") as f:
+                    f.write("5")
+            except OSError:
+                self.resettable = False
+
+
+class _TracemallocMeter:
+    def current(self) -> int:
+        return tracemalloc.get_traced_memory()[0]
+
+    def peak(self) -> int:
+        return tracemalloc.get_traced_memory()[1]
+
+    def reset_peak(self) -> None:
+        tracemalloc.reset_peak()
+
+
+class _NullStage:
+    """What `stage()` returns when profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, name: str, value=1) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """One timed span; `count()` attaches counters (rooms, bytes, ...)."""
+
+    __slots__ = ("profiler", "name", "start_ns", "end_ns", "start_mem", "peak_mem", "counters", "depth")
+
+    def __init__(self, profiler: "Profiler", name: str, counters: Dict):
+        self.profiler = profiler
+        self.name = name
+        self.counters = dict(counters)
+        self.start_ns = self.end_ns = 0
+        self.start_mem = self.peak_mem = 0
+        self.depth = 0
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self)
+        return False
+
+    def count(self, name: str, value=1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class Profiler:
+    """Collects stages for one run (a CLI invocation or one Streamlit rerun)."""
+
+    def __init__(self, memory: str = "rss"):
+        if memory not in MEMORY_MODES:
+            raise ValueError(f"memory must be one of {MEMORY_MODES}, got {memory!r}")
+        self.memory = memory
+        self._meter = {"rss": _RssMeter, "tracemalloc": _TracemallocMeter}.get(memory, lambda: None)()
+        self.stages: List[Stage] = []
+        self._open: List[Stage] = []
+        self._origin_ns = time.perf_counter_ns()
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def activate(self):
+        """Make this the profiler `stage()` reports to."""
+        if self.memory == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def stage(self, name: str, **counters) -> Stage:
+        return Stage(self, name, counters)
+
+    def _enter(self, s: Stage) -> None:
+        meter = self._meter
+        if meter:
+            # reset_peak() below would lose the enclosing stages' peaks.
+            peak = meter.peak()
+            for parent in self._open:
+                parent.peak_mem = max(parent.peak_mem, peak)
+            meter.reset_peak()
+            s.start_mem = meter.current()
+        s.depth = len(self._open)
+        self._open.append(s)
+        self.stages.append(s)
+        s.start_ns = time.perf_counter_ns()
+
+    def _exit(self, s: Stage) -> None:
+        s.end_ns = time.perf_counter_ns()
+        if self._meter:
+            s.peak_mem = max(s.peak_mem, self._meter.peak())
+        self._open.remove(s)
+        for parent in self._open:
+            parent.peak_mem = max(parent.peak_mem, s.peak_mem)
+
+    def summary(self) -> List[Dict]:
+        """One row per finished stage, in start order.
+
+        `peak_mb` is how far memory rose above its level at the stage start.
+        """
+        rows = []
+        for s in self.stages:
+            if not s.end_ns:
+                continue
+            row = {"stage": "  " * s.depth + s.name, "seconds": round(s.seconds, 4)}
+            if self._meter:
+                row["peak_mb"] = round(max(0, s.peak_mem - s.start_mem) / 1e6, 2)
+            row.update(s.counters)
+            rows.append(row)
+        return rows
+
+    def chrome_trace(self) -> Dict:
+        """Chrome trace-event JSON (complete "X" events, microseconds)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for s in self.stages:
+            if not s.end_ns:
+                continue
+            args = dict(s.counters)
+            if self._meter:
+                args["peak_mb"] = round(max(0, s.peak_mem - s.start_mem) / 1e6, 2)
+            events.append({
+                "name": s.name, "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+                "ts": (s.start_ns - self._origin_ns) / 1e3, "dur": (s.end_ns - s.start_ns) / 1e3,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "stages": self.summary()}
+
+    def write(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace(), indent=1, default=str))
+        return path
+
+    def format_table(self) -> str:
+        """Plain-text timings table for the console."""
+        rows = self.summary()
+        if not rows:
+            return ""
+        width = max(len(r["stage"]) for r in rows)
+        lines = []
+        for r in rows:
+            extra = " ".join(f"{k}={v}" for k, v in r.items() if k not in ("stage", "seconds", "peak_mb"))
+            mem = f"  {r['peak_mb']:>9.2f} MB" if "peak_mb" in r else ""
+            lines.append(f"  {r['stage']:<{width}}  {r['seconds']:>9.4f} s{mem}  {extra}".rstrip())
+        return "\n".join(lines)
+
+
+def active() -> Optional[Profiler]:
+    return _current.get()
+
+
+def stage(name: str, **counters):
+    """Time a pipeline stage under the active profiler (no-op when none)."""
+    profiler = _current.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name, **counters)
@@ -0,0 +1,190 @@
+"""Resident mode: a warm process that runs successive CLI requests over a Unix socket.
+
+    python main.py resident &                       # imports everything once, then waits
+    export PAINTPILOT_SOCKET=.paintpilot.sock
+    python main.py --input a.pdf --output a.xlsx    # forwarded; no import start-up
+    python main.py resident --stop
+
+The client sends its argv, working directory and config token as one JSON
+line; the server runs the command in-process with stdout/stderr streamed
+back and finishes with the exit code. The config token hashes the files
+that define the finish systems and config (as the client's environment
+resolves them), so a client whose `$PAINTPILOT_FINISH_SYSTEMS` or config
+files differ from what the server loaded at start-up is told to run the
+command itself instead of getting numbers from the wrong registry. Requests are served one at a time (each one
+changes directory), and stdin is not forwarded: `main.py` runs commands
+that read `-` or never return (`serve`) itself. When no server is
+listening the client returns None and the caller runs the command itself.
+
+This module must stay cheap to import: it is on the client's start-up path.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.config import FINISH_SYSTEMS_FILE
+
+DEFAULT_SOCKET = ".paintpilot.sock"
+SOCKET_ENV = "PAINTPILOT_SOCKET"
+# Imported when the server starts so the first request is as fast as the rest.
+WARM_MODULES = ("numpy", "openpyxl", "pdfplumber", "src.calculator", "src.excel_exporter",
+                "src.pdf_processor", "src.takeoff_cache", "src.batch_runner", "src.room_stream")
+
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def config_token() -> str:
+    """Hash of the config sources this process would load: src/config.py plus the
+    finish-systems file `$PAINTPILOT_FINISH_SYSTEMS` (or the default) points to.
+
+    A stdlib-only stand-in for `takeoff_cache.config_fingerprint()`, which
+    needs the compiled registry and so numpy: clients must start fast.
+    """
+    digest = hashlib.sha256()
+    path = os.environ.get("PAINTPILOT_FINISH_SYSTEMS")  # resolved like finish_systems._registry_specs
+    if path is None:
+        path = str(_REPO_ROOT / FINISH_SYSTEMS_FILE)
+    for source in (str(_REPO_ROOT / "src" / "config.py"), path):
+        try:
+            digest.update(Path(source).read_bytes() if source else b"")
+        except OSError:
+            digest.update(b"-")
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def socket_path() -> Optional[str]:
+    """The socket clients should use ($PAINTPILOT_SOCKET), or None when unset."""
+    return os.environ.get(SOCKET_ENV) or None
+
+
+class _StreamWriter:
+    """File-like that forwards writes to the client as {"out"|"err": text} lines."""
+
+    def __init__(self, conn_file, channel: str):
+        self._file = conn_file
+        self._channel = channel
+
+    def write(self, text: str) -> int:
+        if text:
+            self._file.write(json.dumps({self._channel: text}) + "\n")
+        return len(text)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _handle(conn: socket.socket, handler: Callable[[List[str]], Optional[int]], config: str) -> bool:
+    """Serve one request; returns False when the client asked the server to stop."""
+    with conn, conn.makefile("rw", encoding="utf-8") as f:
+        request = json.loads(f.readline() or "{}")
+        if request.get("stop"):
+            f.write(json.dumps({"exit": 0}) + "\n")
+            return False
+        if request.get("ping"):
+            f.write(json.dumps({"pong": True}) + "\n")
+            return True
+        if request.get("config") != config:  # loaded a different config than the client's
+            f.write(json.dumps({"local": True}) + "\n")
+            return True
+        cwd = os.getcwd()
+        out, err = _StreamWriter(f, "out"), _StreamWriter(f, "err")
+        try:
+            os.chdir(request.get("cwd") or cwd)
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    code = handler(list(request.get("argv", [])))
+                except SystemExit as exc:  # argparse --help / usage errors
+                    code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+                    if isinstance(exc.code, str):
+                        print(exc.code, file=sys.stderr)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            os.chdir(cwd)
+        f.write(json.dumps({"exit": code or 0}) + "\n")
+        f.flush()
+    return True
+
+
+def serve_resident(path: str, handler: Callable[[List[str]], Optional[int]], warm: bool = True) -> None:
+    """Accept requests on `path` until a stop request (or Ctrl+C)."""
+    if warm:
+        import importlib
+
+        for name in WARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:  # optional dependency; imported on demand if ever needed
+                pass
+    # Taken after the warm imports, i.e. once the registry is built.
+    config = config_token()
+    if os.path.exists(path):
+        try:  # a live server owns it; a stale file is left behind by a crash
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+                probe.sendall(json.dumps({"ping": True}).encode() + b"\n")
+            raise RuntimeError(f"A resident server is already listening on {path}")
+        except ConnectionRefusedError:
+            os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket usable by this user only
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                if not _handle(conn, handler, config):
+                    break
+            except (OSError, ValueError):  # client went away mid-request
+                continue
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def run_remote(argv: List[str], path: Optional[str] = None, stop: bool = False) -> Optional[int]:
+    """Run `argv` on the resident server; returns its exit code, or None when the caller
+    should run it itself (no server listening, or the server's config differs)."""
+    path = path or socket_path()
+    if not path or not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        conn.close()
+        return None
+    with conn, conn.makefile("rw", encoding="utf-8") as f:
+        f.write(json.dumps({"argv": argv, "cwd": os.getcwd(), "stop": stop, "config": config_token()}) + "\n")
+        f.flush()
+        for line in f:
+            message = json.loads(line)
+            if message.get("local"):
+                return None
+            if "exit" in message:
+                return message["exit"]
+            stream = sys.stdout if "out" in message else sys.stderr
+            stream.write(message.get("out", message.get("err", "")))
+            stream.flush()
+    print("❌ Resident server closed the connection", file=sys.stderr)
+    return 1
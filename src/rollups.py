@@ -0,0 +1,204 @@
+"""Hierarchical takeoff rollups: project -> floor -> room type -> finish system.
+
+One pass over the results assigns every room a group code per level; the
+quantities are then summed per leaf group with `np.bincount`, and any
+coarser grouping (a floor, a system, the grand total) is summed from the
+leaves. Sums are kept in integer hundredths (every result value is already
+rounded to 2 or 1 decimals), so they are exact, independent of summation
+order, and identical to adding the rounded per-room values one by one.
+
+`TakeoffResults.rollup()` caches the Rollup on the result set; the workbook
+sheets, `TakeoffSession`, the app and the CLI summary all read from it.
+
+    rollup = results.rollup(project="Tower", floor="Level 2")
+    rollup.by("floor", "system")      # list of row dicts
+    rollup.totals()                   # the excel_exporter totals shape
+    rollup.tree()                     # project, floors, room types, systems in outline order
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.finish_systems import FIELD_DECIMALS, QUANTITY_FIELDS, REGISTRY, TOTAL_KEYS
+from src.models import Room, TakeoffResults
+
+LEVELS = ("project", "floor", "room_type", "system")
+MEASURES = ("rooms", "gross_area", "net_area") + QUANTITY_FIELDS
+MEASURE_DECIMALS = {"gross_area": 2, "net_area": 2, **FIELD_DECIMALS}
+DEFAULT_PROJECT = "Project"
+DEFAULT_FLOOR = "—"
+
+_TRAILING_NUMBER = re.compile(r"^(.*?\D)[\s#\-.]*\d+[A-Za-z]?$")
+
+
+def room_type(room) -> str:
+    """Room type for grouping: an explicit `room_type`, else the name without its trailing number.
+
+    "Private Office 2" -> "Private Office", "Unit 27" -> "Unit".
+    """
+    explicit = room.get("room_type")
+    if explicit:
+        return str(explicit)
+    name = " ".join(str(room.get("name") or "").split())
+    m = _TRAILING_NUMBER.match(name)
+    return m.group(1).strip(" #-.") if m else (name or "Room")
+
+
+def _factorize(values: Iterable) -> Tuple[np.ndarray, List]:
+    """Codes in first-seen order (so floors keep plan order, not alphabetical)."""
+    seen: Dict = {}
+    codes = [seen.setdefault(v, len(seen)) for v in values]
+    return np.array(codes, dtype=np.int64), list(seen)
+
+
+def _hundredths(column: np.ndarray) -> np.ndarray:
+    values = np.nan_to_num(np.asarray(column, dtype=np.float64), nan=0.0)
+    return np.rint(values * 100)
+
+
+class Rollup:
+    """Leaf groups (one per distinct project/floor/room type/system) and their sums.
+
+    `codes` is (leaves x LEVELS) into `labels[level]`; `sums` is (leaves x
+    MEASURES) int64, room counts as-is and quantities in hundredths.
+    """
+
+    __slots__ = ("codes", "labels", "sums")
+
+    def __init__(self, codes: np.ndarray, labels: Dict[str, List], sums: np.ndarray):
+        self.codes = codes
+        self.labels = labels
+        self.sums = sums
+
+    @classmethod
+    def from_columns(cls, rooms: Sequence[Room], columns: Dict[str, np.ndarray],
+                     project: Optional[str] = None, floor: Optional[str] = None,
+                     weights: Optional[np.ndarray] = None) -> "Rollup":
+        """Group a struct-of-arrays result set (see `TakeoffResults`) in one pass.
+
+        `weights` (integer, one per room) counts each row that many times, e.g.
+        the multipliers of a collapsed typical-floor result set (`src.typical`).
+        """
+        n = len(rooms)
+        floor = floor or DEFAULT_FLOOR
+        floor_codes, floors = _factorize(room.floor or floor for room in rooms)
+        type_codes, types = _factorize(room_type(room) for room in rooms)
+        room_codes = np.column_stack([
+            np.zeros(n, dtype=np.int64), floor_codes, type_codes, columns["finish"].astype(np.int64),
+        ])
+        leaf_codes, leaf = np.unique(room_codes, axis=0, return_inverse=True)
+        leaf = leaf.reshape(-1)
+        values = [np.ones(n)] + [_hundredths(columns[m]) for m in MEASURES[1:]]
+        if weights is not None:
+            values = [v * weights for v in values]
+        # float64 bincount is exact for integer hundredths below 2**53.
+        sums = np.column_stack([np.bincount(leaf, weights=v, minlength=len(leaf_codes)) for v in values])
+        labels = {"project": [project or DEFAULT_PROJECT], "floor": floors, "room_type": types,
+                  "system": list(REGISTRY.names)}
+        return cls(leaf_codes.reshape(-1, len(LEVELS)), labels, sums.astype(np.int64).reshape(-1, len(MEASURES)))
+
+    @classmethod
+    def from_results(cls, results, project: Optional[str] = None, floor: Optional[str] = None) -> "Rollup":
+        """Rollup of any result set: `TakeoffResults` or an iterable of result mappings."""
+        results = TakeoffResults.from_results(results)
+        return cls.from_columns(results.rooms, results.columns, project, floor)
+
+    @classmethod
+    def concat(cls, rollups: Sequence["Rollup"]) -> "Rollup":
+        """Merge rollups (e.g. one per plan set in a consolidated batch)."""
+        labels = {level: [] for level in LEVELS}
+        index = {level: {} for level in LEVELS}
+        parts = []
+        for rollup in rollups:
+            remapped = np.empty_like(rollup.codes)
+            for j, level in enumerate(LEVELS):
+                lookup = index[level]
+                mapping = np.array([lookup.setdefault(label, len(lookup)) for label in rollup.labels[level]],
+                                   dtype=np.int64)
+                remapped[:, j] = mapping[rollup.codes[:, j]] if len(mapping) else rollup.codes[:, j]
+            parts.append((remapped, rollup.sums))
+        for level in LEVELS:
+            labels[level] = list(index[level])
+        if not parts:
+            return cls(np.zeros((0, len(LEVELS)), dtype=np.int64), labels, np.zeros((0, len(MEASURES)), dtype=np.int64))
+        codes = np.concatenate([c for c, _ in parts])
+        sums = np.concatenate([s for _, s in parts])
+        leaf_codes, leaf = np.unique(codes, axis=0, return_inverse=True)
+        merged = np.zeros((len(leaf_codes), len(MEASURES)), dtype=np.int64)
+        np.add.at(merged, leaf.reshape(-1), sums)
+        return cls(leaf_codes.reshape(-1, len(LEVELS)), labels, merged)
+
+    # --- queries ---
+
+    def _group(self, levels: Sequence[str]):
+        """(group codes per level, summed int rows) for a grouping by `levels`."""
+        cols = [LEVELS.index(level) for level in levels]
+        if not cols:
+            return np.zeros((1, 0), dtype=np.int64), self.sums.sum(axis=0, keepdims=True)
+        keys, inverse = np.unique(self.codes[:, cols], axis=0, return_inverse=True)
+        grouped = np.zeros((len(keys), len(MEASURES)), dtype=np.int64)
+        np.add.at(grouped, inverse.reshape(-1), self.sums)
+        return keys.reshape(-1, len(cols)), grouped
+
+    def _row(self, levels, key, sums, system: Optional[int] = None) -> Dict:
+        row = {level: self.labels[level][code] for level, code in zip(levels, key)}
+        fields = REGISTRY.systems[system].fields if system is not None else QUANTITY_FIELDS
+        row["rooms"] = sums[0]
+        for j, measure in enumerate(MEASURES[1:], start=1):
+            value = round(sums[j] / 100, MEASURE_DECIMALS[measure])
+            row[measure] = value if measure in ("gross_area", "net_area") or measure in fields else None
+        return row
+
+    def by(self, *levels: str) -> List[Dict]:
+        """One row per group of `levels` (in first-seen order), with every measure."""
+        unknown = set(levels) - set(LEVELS)
+        if unknown:
+            raise ValueError(f"Unknown rollup level(s) {sorted(unknown)}; use {LEVELS}")
+        keys, grouped = self._group(levels)
+        system_col = levels.index("system") if "system" in levels else None
+        return [self._row(levels, key, sums, None if system_col is None else int(key[system_col]))
+                for key, sums in zip(keys.tolist(), grouped.tolist())]
+
+    def grand_total(self) -> Dict:
+        return self.by()[0]
+
+    def tree(self, depth: int = len(LEVELS)) -> List[Dict]:
+        """Outline rows: each project, then its floors, their room types and their systems.
+
+        Every row has `level` (the deepest level it groups by) and `depth`.
+        """
+        rows = []
+        for d in range(1, depth + 1):
+            levels = LEVELS[:d]
+            keys, grouped = self._group(levels)
+            system = d == len(LEVELS)
+            for key, sums in zip(keys.tolist(), grouped.tolist()):
+                row = self._row(levels, key, sums, key[-1] if system else None)
+                row.update(level=levels[-1], depth=d - 1)
+                rows.append((tuple(key), row))
+        # Parents sort before their children: a prefix sorts before its extensions.
+        rows.sort(key=lambda item: item[0])
+        return [row for _, row in rows]
+
+    def totals(self) -> Dict:
+        """`{"net": ..., <system>: {"rooms", "area", primer/finish/total/rolls}}` (excel_exporter shape)."""
+        keys, grouped = self._group(("system",))
+        per_system = {int(k[0]): sums for k, sums in zip(keys.tolist(), grouped)}
+        net = MEASURES.index("net_area")
+        totals = {"net": int(self.sums[:, net].sum()) / 100}
+        for code, system in enumerate(REGISTRY.systems):
+            sums = per_system.get(code, np.zeros(len(MEASURES), dtype=np.int64))
+            totals[system.name] = {"rooms": int(sums[0]), "area": int(sums[net]) / 100,
+                                   **{TOTAL_KEYS[f]: int(sums[MEASURES.index(f)]) / 100 for f in system.fields}}
+        return totals
+
+    def to_dataframe(self, *levels: str, labels: Optional[Dict[str, str]] = None):
+        """DataFrame of `by(*levels)`, or of the outline (`tree()`) when no levels are given."""
+        import pandas as pd
+
+        rows = self.by(*levels) if levels else self.tree()
+        df = pd.DataFrame(rows)
+        return df.rename(columns=labels) if labels else df
+
@@ -0,0 +1,220 @@
+"""Streaming takeoff for large CSV / NDJSON room lists.
+
+Rooms are read lazily, computed `chunk_size` at a time through the columnar
+engine and appended to a CSV or Parquet file, so memory depends on the chunk
+size and not on the input size. Column names follow the PDF schedule
+aliases (`pdf_processor.HEADER_ALIASES`), plus the canonical room keys.
+
+    python main.py stream portfolio.csv.gz --out results.parquet
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.calculator import process_takeoff
+from src.finish_systems import QUANTITY_FIELDS, REGISTRY
+from src.models import TakeoffResults, _none
+from src.pdf_processor import HEADER_ALIASES, _normalize_header, room_from_cells
+from src.rollups import MEASURE_DECIMALS, MEASURES
+
+DEFAULT_CHUNK_SIZE = 50_000
+INPUT_FORMATS = ("csv", "ndjson")
+OUTPUT_FORMATS = ("csv", "parquet")
+SUMMARY_MEASURES = ("net_area", "total_gallons", "rolls")
+OUTPUT_COLUMNS = ("id", "name", "floor", "length", "width", "height", "doors", "windows", "finish_type",
+                  "gross_area", "net_area") + QUANTITY_FIELDS
+_SUFFIX_FORMATS = {"csv": "csv", "tsv": "csv", "ndjson": "ndjson", "jsonl": "ndjson", "json": "ndjson",
+                   "parquet": "parquet", "pq": "parquet"}
+
+
+def detect_format(path: str, formats, default: Optional[str] = None) -> str:
+    """Format of `path` from its suffix (`.gz` ignored); `default` when unknown."""
+    suffixes = [s.lower().lstrip(".") for s in Path(path).suffixes if s.lower() != ".gz"]
+    fmt = _SUFFIX_FORMATS.get(suffixes[-1]) if suffixes else None
+    if fmt in formats:
+        return fmt
+    if default:
+        return default
+    raise ValueError(f"Can't tell the format of {path!r}; pass one of {formats}")
+
+
+def _open_text(path: str):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _room_keys(fields: Iterable[str]) -> List[Optional[str]]:
+    return [HEADER_ALIASES.get(_normalize_header(f)) for f in fields]
+
+
+def iter_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Raw rows keyed by room key (aliases resolved); nothing is validated yet."""
+    fmt = fmt or detect_format(path, INPUT_FORMATS, default="csv" if path == "-" else None)
+    with _open_text(path) as f:
+        if fmt == "csv":
+            sample = f.readline()
+            dialect = csv.excel_tab if "\t" in sample and "," not in sample else csv.excel
+            reader = csv.reader(f, dialect)
+            keys = _room_keys(next(csv.reader([sample], dialect), []))
+            for row in reader:
+                yield {k: v for k, v in zip(keys, row) if k and v != ""}
+        else:
+            keys: Dict[str, Optional[str]] = {}
+            for line in f:
+                if not line.strip():
+                    continue
+                if not keys and line.lstrip().startswith("["):
+                    raise ValueError(f"{path!r} is a JSON array; streaming reads NDJSON (one room object "
+                                     f"per line), e.g. `jq -c '.[]' rooms.json > rooms.ndjson`")
+                record = json.loads(line)
+                out = {}
+                for field, value in record.items():
+                    key = keys.get(field)
+                    if key is None and field not in keys:
+                        key = keys[field] = HEADER_ALIASES.get(_normalize_header(field))
+                    if key and value not in (None, ""):
+                        out[key] = value
+                yield out
+
+
+def iter_rooms(path: str, fmt: Optional[str] = None, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Room dicts from a CSV / NDJSON file; rows without an id/name or size are skipped.
+
+    Pass a dict as `stats` to get a running `skipped` count.
+    """
+    skipped = 0
+    for record in iter_records(path, fmt):
+        room = room_from_cells(record)
+        if room is None:
+            skipped += 1
+            if stats is not None:
+                stats["skipped"] = skipped
+            continue
+        yield room
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CsvResultWriter:
+    def __init__(self, path: str):
+        self._file = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, results: TakeoffResults) -> None:
+        c = results.columns
+        columns = [c[name].tolist() for name in ("finish", "gross_area", "net_area") + QUANTITY_FIELDS]
+        names = REGISTRY.names
+        self._writer.writerows(
+            [room.id, room.name, room.floor, room.length, room.width, room.height, room.doors, room.windows,
+             names[code], gross, net, _none(primer), _none(finish), _none(total), _none(rolls)]
+            for room, code, gross, net, primer, finish, total, rolls in zip(results.rooms, *columns)
+        )
+
+    def close(self) -> None:
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetResultWriter:
+    """One row group per chunk; needs the optional `pyarrow` package."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow), or write .csv instead") from None
+        self._pa = pa
+        self._schema = pa.schema(
+            [("id", pa.string()), ("name", pa.string()), ("floor", pa.string())]
+            + [(k, pa.float64()) for k in ("length", "width", "height")]
+            + [(k, pa.int64()) for k in ("doors", "windows")]
+            + [("finish_type", pa.dictionary(pa.int16(), pa.string()))]
+            + [(k, pa.float64()) for k in ("gross_area", "net_area") + QUANTITY_FIELDS]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._finish_names = pa.array(REGISTRY.names, pa.string())
+
+    def write(self, results: TakeoffResults) -> None:
+        pa = self._pa
+        rooms, c = results.rooms, results.columns
+        arrays = [
+            pa.array([r.id for r in rooms], pa.string()),
+            pa.array([r.name for r in rooms], pa.string()),
+            pa.array([r.floor for r in rooms], pa.string()),
+            pa.array([r.length for r in rooms], pa.float64()),
+            pa.array([r.width for r in rooms], pa.float64()),
+            pa.array([r.height for r in rooms], pa.float64()),
+            pa.array([r.doors for r in rooms], pa.int64()),
+            pa.array([r.windows for r in rooms], pa.int64()),
+            pa.DictionaryArray.from_arrays(pa.array(c["finish"], pa.int16()), self._finish_names),
+        ]
+        for name in ("gross_area", "net_area") + QUANTITY_FIELDS:
+            values = c[name]
+            arrays.append(pa.array(values, pa.float64(), mask=np.isnan(values)))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvResultWriter, "parquet": ParquetResultWriter}
+
+
+def stream_takeoff(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk=None,
+) -> Dict:
+    """Compute a takeoff for every room in `input_path`, writing rows to `output_path`.
+
+    Returns a summary: rooms, skipped rows, chunks and rounded totals.
+    """
+    input_format = input_format or detect_format(input_path, INPUT_FORMATS,
+                                                 default="csv" if input_path == "-" else None)
+    output_format = output_format or detect_format(output_path, OUTPUT_FORMATS, default="csv")
+    if output_path != "-":
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    stats = {"skipped": 0}
+    summary = {"rooms": 0, "chunks": 0, "net_area": 0.0, "total_gallons": 0.0, "rolls": 0.0}
+    # Grand totals in integer hundredths, summed from each chunk's rollup
+    # (the workbook's arithmetic, so the totals match it to the cent).
+    sums = np.zeros(len(MEASURES), dtype=np.int64)
+    writer = WRITERS[output_format](output_path)
+    try:
+        for chunk in chunked(iter_rooms(input_path, input_format, stats), chunk_size):
+            results = process_takeoff({"rooms": chunk})
+            writer.write(results)
+            sums += results.rollup().sums.sum(axis=0)
+            summary["rooms"] += len(results)
+            summary["chunks"] += 1
+            for measure in SUMMARY_MEASURES:
+                summary[measure] = round(int(sums[MEASURES.index(measure)]) / 100, MEASURE_DECIMALS[measure])
+            if on_chunk:
+                on_chunk(summary)
+    finally:
+        writer.close()
+    summary["skipped"] = stats["skipped"]
+    return summary
@@ -0,0 +1,222 @@
+"""What-if alternates: evaluate many finish-system variants against every room at once.
+
+A scenario is a set of overrides keyed `system.product.param`:
+
+    paint.finish.coats = 1          # 1 vs 2 finish coats
+    paint.primer.coats = 0          # no primer
+    paint.*.coverage = 350          # every paint product
+    wallcovering.rolls.coverage = 36  # a different roll size (sq ft per roll)
+    paint.finish.price = 38.50      # $ per gallon / roll
+
+`product` is a product field (`primer`, `finish`, `rolls`), a product name
+or `*`; `param` is `coats`, `coverage`, `waste`, `pattern_repeat_in` or
+`price`. Each scenario compiles its own finish registry; the rooms are
+reduced to their distinct (finish, net area, height) triples and the
+quantities of every scenario x triple are computed as one broadcast array,
+rounded per room exactly like `process_takeoff`, and summed in integer
+hundredths. A scenario with no overrides therefore matches the takeoff
+totals to the cent.
+
+    scenarios = [Scenario("1 coat", {"paint.finish.coats": 1})] + scenario_grid(
+        {"paint.primer.coats": [0, 1], "paint.finish.coverage": [350, 400]})
+    rows = evaluate_scenarios(results, scenarios, prices={"paint.finish": 38.5})
+    generate_workbook(results, "bid.xlsx", alternates=rows)
+"""
+
+import copy
+import itertools
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.batch_engine import round_like_python
+from src.finish_systems import FIELD_DECIMALS, PRODUCT_FIELDS, QUANTITY_FIELDS, REGISTRY, TOTAL_KEYS, FinishRegistry
+from src.geometry import wall_areas
+from src.models import Room, room_columns
+
+PRODUCT_PARAMS = ("coats", "coverage", "waste", "pattern_repeat_in")
+PARAMS = PRODUCT_PARAMS + ("price",)
+BASE_SCENARIO = "Base"
+# Scenario x distinct-room quantities are computed this many elements at a time.
+CHUNK_ELEMENTS = 4_000_000
+
+_FIELD_BY_SHORT = {TOTAL_KEYS[f]: f for f in PRODUCT_FIELDS}
+
+
+class Scenario(NamedTuple):
+    name: str
+    overrides: Dict[str, float]
+
+
+def _label(overrides: Dict[str, float]) -> str:
+    return ", ".join(f"{k}={v:g}" for k, v in overrides.items()) or BASE_SCENARIO
+
+
+def scenario_grid(grid: Dict[str, Sequence[float]], first: int = 1) -> List[Scenario]:
+    """Every combination of the listed values (cartesian product), named "Alt <n>" from `first`."""
+    keys = list(grid)
+    combos = itertools.product(*(grid[k] for k in keys)) if keys else ()
+    return [Scenario(f"Alt {n}", dict(zip(keys, values))) for n, values in enumerate(combos, start=first)]
+
+
+def load_scenarios(path) -> Tuple[List[Scenario], Dict[str, float]]:
+    """Scenarios and base prices from a JSON file.
+
+    {"prices": {"paint.finish": 38.5},
+     "scenarios": [{"name": "One coat", "set": {"paint.finish.coats": 1}}],
+     "grid": {"paint.primer.coats": [0, 1]}}
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: expected an object with 'scenarios' and/or 'grid'")
+    scenarios = [Scenario(s.get("name") or _label(s.get("set", {})), dict(s.get("set", {})))
+                 for s in spec.get("scenarios", [])]
+    scenarios += scenario_grid(spec.get("grid", {}), first=len(scenarios) + 1)
+    return scenarios, dict(spec.get("prices", {}))
+
+
+def _parse_key(key: str) -> Tuple[str, str, str]:
+    parts = key.split(".")
+    if len(parts) != 3:
+        raise ValueError(f"Override {key!r}: use system.product.param (e.g. paint.finish.coats)")
+    system, product, param = (p.strip().lower() for p in parts)
+    if system not in REGISTRY.names:
+        raise ValueError(f"Override {key!r}: unknown finish system {system!r}")
+    if param not in PARAMS:
+        raise ValueError(f"Override {key!r}: unknown parameter {param!r} (use {PARAMS})")
+    return system, product, param
+
+
+def _product_matches(product: Dict, selector: str) -> bool:
+    return selector in ("*", TOTAL_KEYS.get(product["field"]), product.get("name", "").lower())
+
+
+def _price_fields(system: str, selector: str) -> List[str]:
+    """Product fields a price selector refers to."""
+    if selector in _FIELD_BY_SHORT:
+        return [_FIELD_BY_SHORT[selector]]
+    products = REGISTRY.spec()[system]["products"]
+    fields = [p["field"] for p in products if _product_matches(p, selector)]
+    if not fields:
+        raise ValueError(f"No product {selector!r} in finish system {system!r}")
+    return list(dict.fromkeys(fields))
+
+
+def _prices(prices: Dict[str, float]) -> Dict[Tuple[str, str], float]:
+    """{"paint.finish": 38.5} or {"paint.finish.price": 38.5} -> {("paint", "finish_gallons"): 38.5}"""
+    out = {}
+    for key, value in prices.items():
+        system, selector, _ = _parse_key(key if key.endswith(".price") else f"{key}.price")
+        for field in _price_fields(system, selector):
+            out[(system, field)] = float(value)
+    return out
+
+
+def apply_overrides(specs: Dict[str, Dict], overrides: Dict[str, float]) -> Dict[str, Dict]:
+    """Copy of the finish-system specs with the product overrides applied (prices are ignored)."""
+    specs = copy.deepcopy(specs)
+    for key, value in overrides.items():
+        system, selector, param = _parse_key(key)
+        if param == "price":
+            continue
+        matched = [p for p in specs[system]["products"] if _product_matches(p, selector)]
+        if not matched:
+            raise ValueError(f"Override {key!r}: no product {selector!r} in finish system {system!r}")
+        for product in matched:
+            product[param] = value
+    return specs
+
+
+def _room_list(source) -> List[Room]:
+    if hasattr(source, "rooms"):  # TakeoffResults
+        return source.rooms
+    rooms = source.get("rooms", []) if isinstance(source, dict) else source
+    return [Room.from_mapping(r) for r in rooms]
+
+
+def evaluate_scenarios(source, scenarios: Sequence[Scenario], prices: Optional[Dict[str, float]] = None,
+                       include_base: bool = True) -> List[Dict]:
+    """Totals of every scenario over every room of `source`.
+
+    `source` is a TakeoffResults, a rooms_data dict or a list of rooms.
+    Returns one row per scenario (the base first when `include_base`) with
+    the quantity totals, `cost` (None unless some price is set) and the
+    difference from the first row.
+    """
+    scenarios = list(scenarios)
+    if include_base:
+        scenarios.insert(0, Scenario(BASE_SCENARIO, {}))
+    if not scenarios:
+        return []
+    base_specs = REGISTRY.spec()
+    registries = [FinishRegistry(apply_overrides(base_specs, s.overrides)) for s in scenarios]
+    base_prices = _prices(prices or {})
+    scenario_prices = [{**base_prices, **_prices({k: v for k, v in s.overrides.items() if k.endswith(".price")})}
+                       for s in scenarios]
+
+    columns = room_columns(_room_list(source))
+    _, net = wall_areas(columns)
+    uses_height = any(r.uses_height for r in registries)
+    height = columns["height"] if uses_height else np.zeros_like(net)
+    # Quantities only depend on (finish, net, height): evaluate each distinct triple once.
+    keys = np.column_stack([columns["finish"].astype(np.float64), net, height])
+    distinct, counts = np.unique(keys, axis=0, return_counts=True)
+    codes = distinct[:, 0].astype(np.int64)
+    net_u, height_u = distinct[:, 1], distinct[:, 2]
+    inv_h = np.divide(1.0, height_u, out=np.zeros_like(net_u), where=height_u > 0)
+    # weights[u, c]: how many rooms triple u stands for, in finish system c
+    weights = np.zeros((len(codes), len(REGISTRY)), dtype=np.int64)
+    weights[np.arange(len(codes)), codes] = counts
+
+    mult = np.stack([r.mult for r in registries])
+    repeat = np.stack([r.repeat for r in registries])
+    div = np.stack([r.div for r in registries])
+    applies = np.stack([r.applies for r in registries])
+    decimals = [FIELD_DECIMALS[f] for f in QUANTITY_FIELDS]
+
+    # totals[s, c, f]: scenario s, finish system c, QUANTITY_FIELDS f, in hundredths
+    totals = np.zeros((len(scenarios), len(REGISTRY), len(QUANTITY_FIELDS)), dtype=np.int64)
+    step = max(1, CHUNK_ELEMENTS // max(1, len(codes) * len(PRODUCT_FIELDS)))
+    for start in range(0, len(scenarios), step):
+        block = slice(start, start + step)
+        m = mult[block][:, codes]
+        if uses_height:
+            m = m + repeat[block][:, codes] * inv_h[None, :, None]
+        q = (net_u[None, :, None] * m) / div[block][:, codes]
+        primer, finish, rolls = q[..., 0], q[..., 1], q[..., 2]
+        for j, values in enumerate((primer, finish, primer + finish, rolls)):
+            hundredths = np.rint(round_like_python(values, decimals[j]) * 100).astype(np.int64)
+            hundredths *= applies[block][:, codes, j]
+            totals[block, :, j] = hundredths @ weights
+
+    field_index = {f: j for j, f in enumerate(QUANTITY_FIELDS)}
+    rows = []
+    for s, scenario in enumerate(scenarios):
+        row = {"scenario": scenario.name, "changes": _label(scenario.overrides) if scenario.overrides else ""}
+        for j, field in enumerate(QUANTITY_FIELDS):
+            row[field] = round(int(totals[s, :, j].sum()) / 100, FIELD_DECIMALS[field])
+        cost = None
+        if scenario_prices[s]:
+            cents = sum(int(totals[s, REGISTRY.code(system), field_index[field]]) * price
+                        for (system, field), price in scenario_prices[s].items())
+            cost = round(cents / 100, 2)
+        row["cost"] = cost
+        rows.append(row)
+    first = rows[0]
+    for row in rows:
+        for field in ("total_gallons", "rolls", "cost"):
+            if row[field] is None or first[field] is None:
+                row[f"delta_{field}"] = None
+            else:
+                row[f"delta_{field}"] = round(row[field] - first[field], 1 if field == "rolls" else 2)
+    return rows
+
+
+def scenario_dataframe(rows: List[Dict], labels: Optional[Dict[str, str]] = None):
+    """Comparison table of `evaluate_scenarios` rows as a DataFrame."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    return df.rename(columns=labels) if labels else df
@@ -0,0 +1,94 @@
+"""Seeded generator of realistic synthetic projects for benchmarks and test PDFs.
+
+Rooms follow typical office/residential proportions: each room type has its
+own size range, openings and finish mix. Besides paint and wallcovering,
+OTHER_SYSTEMS_SHARE of the rooms get one of the registry's other finish
+systems (epoxy, stain, Type II vinyl...), so every system is exercised. The
+same seed and finish-system config always produce the same project, so
+benchmark runs are comparable.
+"""
+
+import random
+from typing import Dict, List
+
+from src.finish_systems import REGISTRY
+
+# name, (length range), (width range), doors, windows, wallcovering share
+ROOM_TYPES = [
+    ("Private Office", (10, 14), (9, 12),  (1, 1), (0, 2), 0.05),
+    ("Open Office",    (25, 60), (18, 35), (2, 3), (3, 8), 0.05),
+    ("Conference",     (14, 28), (12, 18), (1, 2), (0, 4), 0.35),
+    ("Corridor",       (30, 90), (5, 8),   (2, 8), (0, 0), 0.30),
+    ("Break Room",     (12, 20), (10, 16), (1, 2), (0, 3), 0.40),
+    ("Restroom",       (8, 14),  (6, 10),  (1, 1), (0, 0), 0.50),
+    ("Storage",        (6, 12),  (5, 10),  (1, 1), (0, 0), 0.00),
+    ("Lobby",          (20, 40), (15, 30), (2, 4), (2, 6), 0.60),
+    ("Unit",           (20, 35), (15, 25), (1, 3), (2, 5), 0.10),
+]
+ROOM_WEIGHTS = [30, 6, 8, 6, 4, 8, 8, 1, 29]
+FLOOR_HEIGHTS = [8, 9, 9, 10]
+OTHER_SYSTEMS_SHARE = 0.10
+
+
+def _finish(wc_share: float, rnd: random.Random) -> str:
+    if rnd.random() < wc_share:
+        return "wallcovering"
+    others = [name for name in REGISTRY.names if name not in ("paint", "wallcovering")]
+    if others and rnd.random() < OTHER_SYSTEMS_SHARE:
+        return rnd.choice(others)
+    return "paint"
+
+
+def synthetic_rooms(floor_no: int, n_rooms: int, rnd: random.Random) -> List[Dict]:
+    height = rnd.choice(FLOOR_HEIGHTS)
+    counts: Dict[str, int] = {}
+    rooms = []
+    for j in range(1, n_rooms + 1):
+        name, (l0, l1), (w0, w1), (d0, d1), (n0, n1), wc_share = rnd.choices(ROOM_TYPES, ROOM_WEIGHTS)[0]
+        counts[name] = counts.get(name, 0) + 1
+        rooms.append({
+            "id": f"{floor_no}{j:03d}" if n_rooms >= 100 else f"{floor_no}{j:02d}",
+            "name": f"{name} {counts[name]}",
+            "length": rnd.randint(l0, l1),
+            "width": rnd.randint(w0, w1),
+            "height": height,
+            "doors": rnd.randint(d0, d1),
+            "windows": rnd.randint(n0, n1),
+            "finish_type": _finish(wc_share, rnd),
+            "floor": f"Floor {floor_no}",
+        })
+    return rooms
+
+
+def _renumbered(rooms: List[Dict], from_floor: int, to_floor: int) -> List[Dict]:
+    """Copy of a floor's rooms on another floor (ids keep their room number)."""
+    return [{**r, "id": f"{to_floor}{r['id'][len(str(from_floor)):]}", "floor": f"Floor {to_floor}"}
+            for r in rooms]
+
+
+def synthetic_project(n_floors: int, rooms_per_floor: int, seed: int = 7,
+                      project: str = "Synthetic Tower", typical: bool = False) -> Dict:
+    """A rooms_data dict with n_floors x rooms_per_floor rooms.
+
+    `typical=True` repeats floor 2 on every floor up to the top one, like a
+    tower's typical floors between a lobby and a penthouse.
+    """
+    rnd = random.Random(seed)
+    rooms = []
+    typical_rooms = None
+    for f in range(1, n_floors + 1):
+        if typical_rooms and f < n_floors:
+            rooms.extend(_renumbered(typical_rooms, 2, f))
+            continue
+        floor_rooms = synthetic_rooms(f, rooms_per_floor, rnd)
+        if typical and f == 2:
+            typical_rooms = floor_rooms
+        rooms.extend(floor_rooms)
+    floor = "Floor 1" if n_floors == 1 else f"Floor 1 – Floor {n_floors}"
+    return {"project": project, "floor": floor, "rooms": rooms}
+
+
+def project_of_size(n_rooms: int, seed: int = 7) -> Dict:
+    """About n_rooms rooms: floors of 100 rooms (1,000 from 10k rooms up)."""
+    rooms_per_floor = min(n_rooms, 100 if n_rooms < 10_000 else 1000)
+    return synthetic_project(max(1, n_rooms // rooms_per_floor), rooms_per_floor, seed)
@@ -0,0 +1,184 @@
+"""Content-addressed on-disk cache for extracted rooms and takeoff results.
+
+Entries are keyed by sha256(PDF bytes) + a hash of the calculation config
+(page indexes by the PDF hash alone), stored as zlib-compressed JSON, and
+evicted least-recently-used once the cache directory grows past `max_bytes`.
+Writes go through a temp file and an atomic rename, and eviction holds an
+advisory lock, so several processes can share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic renames only, no eviction lock
+    fcntl = None
+
+import numpy as np
+
+from src.config import DEFAULT_CACHE_DIR, DEFAULT_WALL_HEIGHTS, STANDARD_OPENINGS
+from src.finish_systems import REGISTRY
+from src.models import Room, TakeoffResults
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".json.z"
+
+
+def config_fingerprint() -> str:
+    """Hash of every config value that affects extraction or takeoff numbers."""
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "finish_systems": REGISTRY.spec(),
+            "standard_openings": STANDARD_OPENINGS,
+            "default_wall_heights": DEFAULT_WALL_HEIGHTS,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def file_digest(pdf_source) -> str:
+    """sha256 of a PDF given as a path, bytes, or file-like object."""
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf_source).hexdigest()
+    if isinstance(pdf_source, (str, os.PathLike)):
+        with open(pdf_source, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    if hasattr(pdf_source, "getvalue"):
+        return hashlib.sha256(pdf_source.getvalue()).hexdigest()
+    pos = pdf_source.tell()
+    digest = hashlib.file_digest(pdf_source, "sha256").hexdigest()
+    pdf_source.seek(pos)
+    return digest
+
+
+def cache_key(pdf_source, extractor: str = "mock", digest: Optional[str] = None) -> str:
+    """Key for one plan set under the current config and extraction method.
+
+    Pass `digest` when the file hash is already known to skip re-hashing.
+    """
+    return f"{digest or file_digest(pdf_source)}-{config_fingerprint()}-{extractor}"
+
+
+def _pack(rooms_data: Dict, results) -> bytes:
+    # Results are stored as their columns; their rooms are rooms_data's rooms.
+    columns = {k: v.tolist() for k, v in TakeoffResults.from_results(results).columns.items()}
+    rooms_data = {**rooms_data, "rooms": [dict(r) for r in rooms_data.get("rooms", [])]}
+    payload = json.dumps({"rooms_data": rooms_data, "columns": columns}, separators=(",", ":"))
+    return zlib.compress(payload.encode(), 6)
+
+
+def _unpack(blob: bytes) -> Tuple[Dict, TakeoffResults]:
+    payload = json.loads(zlib.decompress(blob))
+    rooms_data = payload["rooms_data"]
+    rooms = [Room.from_mapping(r) for r in rooms_data.get("rooms", [])]
+    columns = {k: np.array(v, dtype=np.int16 if k == "finish" else np.float64)
+               for k, v in payload["columns"].items()}
+    return rooms_data, TakeoffResults(rooms, columns)
+
+
+class TakeoffCache:
+    """Size-bounded LRU cache of (rooms_data, results) per plan-set key."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{ENTRY_SUFFIX}"
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / ".lock", "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            blob = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return blob
+
+    def _write(self, key: str, blob: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get(self, key: str) -> Optional[Tuple[Dict, TakeoffResults]]:
+        blob = self._read(key)
+        if blob is None:
+            return None
+        try:
+            return _unpack(blob)
+        except (zlib.error, ValueError, KeyError):
+            self._path(key).unlink(missing_ok=True)  # corrupt entry: treat as a miss
+            return None
+
+    def put(self, key: str, rooms_data: Dict, results) -> None:
+        self._write(key, _pack(rooms_data, results))
+
+    # Page indexes (src/page_index.py) depend on the file alone, so they are
+    # keyed by its digest and survive config changes; they share the LRU.
+
+    def get_page_index(self, digest: str, version: int) -> Optional[Dict]:
+        key = f"{digest}-pages-v{version}"
+        blob = self._read(key)
+        if blob is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError):
+            self._path(key).unlink(missing_ok=True)
+            return None
+
+    def put_page_index(self, digest: str, version: int, index: Dict) -> None:
+        payload = json.dumps(index, separators=(",", ":"))
+        self._write(f"{digest}-pages-v{version}", zlib.compress(payload.encode(), 6))
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        with self._locked():
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                Path(path).unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        with self._locked():
+            for path in self.root.glob(f"*{ENTRY_SUFFIX}"):
+                path.unlink(missing_ok=True)
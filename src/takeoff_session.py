@@ -0,0 +1,93 @@
+"""Incremental takeoff: edit, add or remove single rooms without a full recalc.
+
+A TakeoffSession keeps per-room results plus running per-system totals.
+Each change recomputes only the affected room and adjusts the totals by the
+difference. Totals are kept in integer hundredths (every result value is
+already rounded to 2 or 1 decimals), so any number of edits adds up to
+exactly what a fresh full pass would give.
+"""
+
+from typing import Dict, List, Optional
+
+from src.calculator import calculate_room, process_takeoff
+from src.finish_systems import REGISTRY, TOTAL_KEYS
+from src.models import TakeoffResults
+
+
+def _hundredths(value) -> int:
+    return int(round((value or 0.0) * 100))
+
+
+class TakeoffSession:
+    """Mutable takeoff over one rooms_data; rooms are addressed by position."""
+
+    def __init__(self, rooms_data: Dict, results: Optional[List[Dict]] = None):
+        self.project = rooms_data.get("project")
+        self.floor = rooms_data.get("floor")
+        # Own copy: `results` may be shared (e.g. a cached takeoff).
+        self.results: TakeoffResults = (TakeoffResults.from_results(results).copy() if results is not None
+                                        else process_takeoff(rooms_data))
+        self.revision = 0
+        self._totals = {"net": 0}
+        for system in REGISTRY.systems:
+            self._totals[system.name] = {"rooms": 0, "area": 0, **{TOTAL_KEYS[f]: 0 for f in system.fields}}
+        for r in self.results:
+            self._apply(r, +1)
+
+    def _apply(self, r: Dict, sign: int) -> None:
+        """Add (sign=+1) or remove (sign=-1) one result's contribution."""
+        net = _hundredths(r['net_area'])
+        self._totals["net"] += sign * net
+        m = r['materials']
+        system = REGISTRY.get(m['type'])
+        sums = self._totals[system.name]
+        sums["rooms"] += sign
+        sums["area"] += sign * net
+        for field in system.fields:
+            sums[TOTAL_KEYS[field]] += sign * _hundredths(m.get(field))
+
+    @property
+    def rooms_data(self) -> Dict:
+        return {"project": self.project, "floor": self.floor, "rooms": list(self.results.rooms)}
+
+    def update_room(self, index: int, **changes) -> Dict:
+        """Apply field changes to one room (copied, never mutated in place)."""
+        old = self.results[index]
+        new = calculate_room(old['room'].replace(**changes))
+        self._apply(old, -1)
+        self._apply(new, +1)
+        self.results[index] = new
+        self.revision += 1
+        return new
+
+    def add_room(self, room: Dict) -> Dict:
+        new = calculate_room(room)
+        self._apply(new, +1)
+        self.results.append(new)
+        self.revision += 1
+        return new
+
+    def remove_room(self, index: int) -> Dict:
+        old = self.results.pop(index)
+        self._apply(old, -1)
+        self.revision += 1
+        return old
+
+    def find(self, room_id) -> int:
+        """Position of the first room with this id (ValueError if absent)."""
+        for i, room in enumerate(self.results.rooms):
+            if str(room.get('id')) == str(room_id):
+                return i
+        raise ValueError(f"No room with id {room_id!r}")
+
+    def rollup(self):
+        """Project/floor/room type/system sums of the current rooms (cached until the next edit)."""
+        return self.results.rollup(self.project, self.floor)
+
+    def totals(self) -> Dict:
+        """Running totals in the shape `excel_exporter` sheets consume."""
+        totals = {"net": self._totals["net"] / 100}
+        for name, sums in self._totals.items():
+            if name != "net":
+                totals[name] = {k: v if k == "rooms" else v / 100 for k, v in sums.items()}
+        return totals